@@ -1,23 +1,44 @@
 # ai_autofill_service.py
 import os
-from flask import Flask, request, jsonify
+import atexit
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import openai
 from anthropic import Anthropic
 import json
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 import re
-from typing import Dict, List, Any
+import importlib.util
+from typing import Dict, List, Any, Optional
 import requests
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 import time
-from datetime import datetime, timedelta
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
+from selenium.webdriver.common.by import By
+from form_cache import (FormAnalysisCache, form_fingerprint, analysis_key, bind_instructions,
+                        unbind_instructions, flatten_user_data)
+from config_registry import config_registry
+from prompt_encoder import (NON_FILLABLE_TYPES, compact_fields, compact_user_data,
+                            compact_json, count_tokens, resolve_value_refs)
+from instruction_stream import InstructionStreamParser
+from browser_pool import BrowserPool
+from job_queue import JobQueue
+from rate_limiter import RateLimiter
+from llm_providers import create_provider
+from browser_profile import (lean_settings, apply_lean_options, enable_request_blocking,
+                             page_load_stats, browser_memory)
+from page_waits import POLL_INTERVAL, pause, wait_for_page, wait_until_interactable
+from profile_variants import compile_profile
+from select_options import select_best_option
+from form_validator import PASS, FAIL, UNDECIDED, validate_form, verdict
+import metrics
 
 # Load environment variables
 load_dotenv()
@@ -25,20 +46,33 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
-# Rate limiting configuration
-RATE_LIMITS = {
-    'hourly': {
-        'limit': 20,
-        'calls': 0,
-        'reset_time': datetime.now()
-    },
-    'daily': {
-        'limit': 100,
-        'calls': 0,
-        'reset_time': datetime.now()
+# Rate limiting shared by every worker process on the host
+rate_limiter = RateLimiter(
+    path=os.getenv('RATE_LIMIT_DB', 'cache/rate_limits.db'),
+    limits={
+        'hourly': (int(os.getenv('MAX_CALLS_PER_HOUR', 20)), 3600),
+        'daily': (int(os.getenv('MAX_CALLS_PER_DAY', 100)), 86400)
     }
+)
+
+# Seconds a call may wait for capacity before falling back
+RATE_LIMIT_WAIT = float(os.getenv('RATE_LIMIT_WAIT', 5))
+
+PROVIDER_DEFAULT_MODELS = {
+    'openai': 'gpt-4',
+    'anthropic': 'claude-3-opus-20240229'
 }
 
+# Batch analysis limits
+MAX_BATCH_ITEMS = int(os.getenv('MAX_BATCH_ITEMS', 200))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+
+# API keys whose requests race both providers; issued by the operator, never taken from the body
+PREMIUM_API_KEYS = {key.strip() for key in os.getenv('PREMIUM_API_KEYS', '').split(',') if key.strip()}
+
+# Reload config files on SIGHUP without restarting
+config_registry.install_signal_handler()
+
 # Initialize AI clients with environment variables
 try:
     openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
@@ -52,84 +86,572 @@ except Exception as e:
     print(f"Error initializing Claude client: {e}")
     claude_client = None
 
-def check_rate_limits():
-    """Check and update rate limits"""
-    now = datetime.now()
-    
-    # Reset hourly limit if needed
-    if now - RATE_LIMITS['hourly']['reset_time'] > timedelta(hours=1):
-        RATE_LIMITS['hourly']['calls'] = 0
-        RATE_LIMITS['hourly']['reset_time'] = now
+# Live, recording or replaying providers depending on LLM_PROVIDER_MODE
+ai_providers = {
+    name: provider for name, provider in (
+        ('openai', create_provider('openai', openai_client)),
+        ('anthropic', create_provider('anthropic', claude_client))
+    ) if provider
+}
+
+FIELD_TAGS = ['input', 'textarea', 'select']
+
+ANALYSIS_SYSTEM_PROMPT = "You are an expert at analyzing HTML forms and creating precise filling instructions."
+
+# lxml parses large pages an order of magnitude faster than the pure-Python parser
+DEFAULT_HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+# Analyses keyed by form structure, shared by every request in this process
+form_cache = FormAnalysisCache(
+    path=os.getenv('FORM_CACHE_PATH', 'cache/form_analysis.db'),
+    max_entries=int(os.getenv('FORM_CACHE_MAX_ENTRIES', 512)),
+    ttl=float(os.getenv('FORM_CACHE_TTL', 86400))
+)
+
+class LatencyTracker:
+    """Recent successful response times per provider"""
     
-    # Reset daily limit if needed
-    if now - RATE_LIMITS['daily']['reset_time'] > timedelta(days=1):
-        RATE_LIMITS['daily']['calls'] = 0
-        RATE_LIMITS['daily']['reset_time'] = now
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = {}
+        self._window = window
+        self._lock = threading.Lock()
     
-    # Check if limits are exceeded
-    if (RATE_LIMITS['hourly']['calls'] >= RATE_LIMITS['hourly']['limit'] or
-        RATE_LIMITS['daily']['calls'] >= RATE_LIMITS['daily']['limit']):
-        return False
+    def record(self, provider: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self._window)).append(seconds)
     
-    # Update counters
-    RATE_LIMITS['hourly']['calls'] += 1
-    RATE_LIMITS['daily']['calls'] += 1
-    return True
+    def percentile(self, provider: str, fraction: float):
+        """Observed latency percentile, or None until enough samples exist"""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+provider_latency = LatencyTracker()
+
+def check_rate_limits(provider: str) -> bool:
+    """Take a call from the provider's budget, waiting briefly for capacity"""
+    if rate_limiter.acquire(provider, timeout=RATE_LIMIT_WAIT):
+        return True
+    metrics.rate_limit_rejections_total.inc(provider=provider)
+    return False
 
 class AIFormAnalyzer:
     """Analyzes form HTML and generates filling instructions using AI"""
     
-    def __init__(self, config_path='config/autofill.json'):
-        try:
-            with open(config_path, 'r') as f:
-                self.config = json.load(f)
-        except Exception as e:
-            print(f"Error loading config: {e}")
-            self.config = {}
-            
-        self.field_patterns = self.config.get('field_patterns', {})
+    def __init__(self, config_path='config/autofill.json', ai_provider: str = None,
+                 hedge_mode: str = None):
+        # Parsed once per process and reloaded when the file changes
+        snapshot = config_registry.get(config_path, required=False)
+        self.config = snapshot.data
+        self.field_patterns = snapshot.field_patterns
         self.ai_settings = self.config.get('ai_settings', {})
+        self.ai_provider = ai_provider
+        self.pattern_index = snapshot.pattern_index
+        
+        # 'off', 'hedge' (fire the secondary provider when the primary is slow)
+        # or 'race' (fire both at once)
+        self.hedging = self.ai_settings.get('hedging', {})
+        self.hedge_mode = hedge_mode or self.hedging.get('mode', 'off')
         
     def analyze_form_html(self, html_content: str, user_data: Dict) -> Dict[str, Any]:
         """Analyze form HTML and create filling instructions"""
         
-        # Clean HTML for AI processing
-        soup = BeautifulSoup(html_content, 'html.parser')
+        form_fields = self._extract_fields_from_html(html_content)
         
-        # Extract form structure
-        form_fields = self._extract_form_fields(soup)
+        return self._analyze_fields(form_fields, user_data)
+    
+    def _extract_fields_from_html(self, html_content: str) -> List[Dict]:
+        """Parse HTML and extract its form structure, recording parse metrics"""
+        with metrics.html_parse_seconds.time():
+            # Clean HTML for AI processing
+            soup = self._parse_html(html_content)
+            
+            # Extract form structure
+            form_fields = self._extract_form_fields(soup)
         
-        # Generate AI prompt
-        prompt = self._create_analysis_prompt(form_fields, user_data)
+        metrics.form_field_count.observe(len(form_fields))
+        return form_fields
+    
+    def _analyze_fields(self, form_fields: List[Dict], user_data: Dict,
+                        fingerprint: str = None) -> Dict[str, Any]:
+        """Create filling instructions for already extracted form fields"""
+        # Serve repeat forms from the cache without an AI round trip
+        cache_key = analysis_key(fingerprint or form_fingerprint(form_fields), user_data)
+        cached = self._from_cache(cache_key, form_fields, user_data)
+        if cached:
+            return cached
+        
+        # Large forms are split into sections and analyzed concurrently
+        chunks = self._chunk_fields(form_fields)
+        if len(chunks) > 1:
+            filling_instructions, prompts = self._analyze_chunks(chunks, user_data)
+        else:
+            prompts = [self._create_analysis_prompt(form_fields, user_data)]
+            filling_instructions = self._analyze_prompt(prompts[0])
+        
+        token_counts = [count_tokens(prompt) for prompt in prompts]
+        for tokens in token_counts:
+            metrics.prompt_tokens.observe(tokens)
         
-        # Get AI analysis
-        if openai_client and self.ai_settings.get('openai'):
-            filling_instructions = self._analyze_with_openai(prompt)
-        elif claude_client and self.ai_settings.get('anthropic'):
-            filling_instructions = self._analyze_with_claude(prompt)
+        if filling_instructions.get('fallback'):
+            metrics.analyses_total.inc(outcome='fallback')
+            filling_instructions['instructions'] = self._match_with_patterns(form_fields, user_data)
         else:
-            filling_instructions = self._fallback_analysis()
+            metrics.analyses_total.inc(outcome='ai')
+            filling_instructions['instructions'] = resolve_value_refs(
+                filling_instructions.get('instructions', []), user_data
+            )
+            if not filling_instructions.get('incomplete'):
+                self._cache_analysis(cache_key, filling_instructions, user_data, form_fields)
+        
+        filling_instructions['prompt_stats'] = {
+            'tokens': sum(token_counts),
+            'chars': sum(len(prompt) for prompt in prompts),
+            'fields': len(form_fields),
+            'chunks': len(prompts)
+        }
             
         return filling_instructions
     
+    def analyze_form_batch(self, items: List[Dict], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Analyze many (html, user_data) items, analyzing each distinct form structure once.
+
+        Returns one result per item, in order, with either an 'analysis' or an 'error'.
+        """
+        results = [None] * len(items)
+        groups = {}
+        for index, item in enumerate(items):
+            try:
+                form_fields = self._extract_fields_from_html(item.get('html', ''))
+                fingerprint = form_fingerprint(form_fields)
+                # Only users with the same data keys can share one set of instructions
+                group = groups.setdefault(analysis_key(fingerprint, item.get('user_data', {})),
+                                          {'fields': form_fields, 'fingerprint': fingerprint, 'indexes': []})
+                group['indexes'].append(index)
+            except Exception as e:
+                print(f"Error extracting batch item {index}: {e}")
+                results[index] = {'success': False, 'error': str(e)}
+        
+        def analyze_group(group: Dict) -> List[int]:
+            """Analyze a group's first item and fan the result out; returns items still to analyze.
+
+            Shared instructions refer to user data keys, never to the first
+            user's values: each member gets its own values and select options.
+            """
+            first, *others = group['indexes']
+            first_data = items[first].get('user_data', {})
+            analysis = self._analyze_fields(group['fields'], first_data, group['fingerprint'])
+            results[first] = {'success': True, 'analysis': analysis}
+            
+            if analysis.get('fallback'):
+                for index in others:
+                    member_data = items[index].get('user_data', {})
+                    results[index] = {'success': True, 'analysis': {
+                        **analysis,
+                        'instructions': self._match_with_patterns(group['fields'], member_data)
+                    }}
+                return []
+            
+            template = unbind_instructions(analysis.get('instructions', []), first_data, group['fields'])
+            if not template:
+                # Values derived from the first user's data, or nothing to share: the
+                # others need their own analysis
+                return others
+            unbound = []
+            for index in others:
+                instructions = bind_instructions(template, items[index].get('user_data', {}), group['fields'])
+                if instructions is None:
+                    # A select answer with no option for this user's value
+                    unbound.append(index)
+                    continue
+                results[index] = {'success': True, 'analysis': {
+                    'instructions': instructions,
+                    'summary': analysis.get('summary', ''),
+                    'deduplicated': True
+                }}
+            return unbound
+        
+        def analyze_item(index: int, form_fields: List[Dict], fingerprint: str):
+            analysis = self._analyze_fields(form_fields, items[index].get('user_data', {}), fingerprint)
+            results[index] = {'success': True, 'analysis': analysis}
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(analyze_group, group): group for group in groups.values()}
+            retries = {}
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    for index in future.result():
+                        retries[executor.submit(
+                            analyze_item, index, group['fields'], group['fingerprint'])] = index
+                except Exception as e:
+                    print(f"Error analyzing batch form {group['fingerprint'][:12]}: {e}")
+                    for index in group['indexes']:
+                        if results[index] is None:
+                            results[index] = {'success': False, 'error': str(e)}
+            
+            for future in as_completed(retries):
+                try:
+                    future.result()
+                except Exception as e:
+                    results[retries[future]] = {'success': False, 'error': str(e)}
+        
+        return results
+    
+    def stream_form_analysis(self, html_content: str, user_data: Dict):
+        """Analyze a form, yielding each instruction as soon as the model completes it.
+
+        Yields ('instruction', instruction) events followed by one
+        ('summary', details) event.
+        """
+        form_fields = self._extract_fields_from_html(html_content)
+        
+        fingerprint = form_fingerprint(form_fields)
+        cache_key = analysis_key(fingerprint, user_data)
+        cached = self._from_cache(cache_key, form_fields, user_data)
+        if cached:
+            for instruction in cached.pop('instructions'):
+                yield 'instruction', instruction
+            yield 'summary', cached
+            return
+        
+        if len(self._chunk_fields(form_fields)) > 1:
+            # Chunked forms are analyzed in parallel rather than streamed
+            analysis = self._analyze_fields(form_fields, user_data, fingerprint)
+            for instruction in analysis.get('instructions', []):
+                yield 'instruction', instruction
+            yield 'summary', {key: value for key, value in analysis.items() if key != 'instructions'}
+            return
+        
+        prompt = self._create_analysis_prompt(form_fields, user_data)
+        parser = InstructionStreamParser()
+        emitted = []
+        try:
+            for text in self._stream_provider(prompt):
+                for instruction in parser.feed(text):
+                    instruction = resolve_value_refs([instruction], user_data)[0]
+                    emitted.append(instruction)
+                    yield 'instruction', instruction
+        except Exception as e:
+            print(f"Streaming analysis failed: {e}")
+        
+        response = parser.finish()
+        tokens = count_tokens(prompt)
+        metrics.prompt_tokens.observe(tokens)
+        metrics.analyses_total.inc(outcome='fallback' if response is None else 'ai')
+        if response is None:
+            # Stream failed or produced no JSON: finish with pattern matching
+            analysis = self._fallback_analysis()
+            selectors = {instruction.get('selector') for instruction in emitted}
+            for instruction in self._match_with_patterns(form_fields, user_data):
+                if instruction['selector'] not in selectors:
+                    emitted.append(instruction)
+                    yield 'instruction', instruction
+            analysis.pop('instructions')
+        else:
+            analysis = {'summary': response.get('summary', '')}
+            self._cache_analysis(cache_key, {'instructions': emitted, **analysis}, user_data, form_fields)
+        
+        analysis['prompt_stats'] = {
+            'tokens': tokens,
+            'chars': len(prompt),
+            'fields': len(form_fields),
+            'chunks': 1
+        }
+        yield 'summary', analysis
+    
+    def _stream_provider(self, prompt: str):
+        """Yield response text from the preferred provider's streaming API"""
+        providers = self._available_providers()
+        if not providers:
+            return
+        
+        name = providers[0][0]
+        if not check_rate_limits(name):
+            print("Rate limit exceeded")
+            return
+        
+        settings = self.ai_settings.get(name, {})
+        model = settings.get('model', PROVIDER_DEFAULT_MODELS[name])
+        started = time.monotonic()
+        completed = False
+        try:
+            yield from ai_providers[name].stream(
+                prompt,
+                system=ANALYSIS_SYSTEM_PROMPT if name == 'openai' else None,
+                json_mode=True,
+                model=model,
+                temperature=settings.get('temperature', 0.1),
+                max_tokens=settings.get('max_tokens', 4000 if name == 'openai' else 2000)
+            )
+            completed = True
+        finally:
+            # Time to the end of the stream, comparable with non-streamed calls
+            elapsed = time.monotonic() - started
+            metrics.provider_latency_seconds.observe(elapsed, provider=name, model=model)
+            if completed:
+                provider_latency.record(name, elapsed)
+    
+    def _analyze_prompt(self, prompt: str) -> Dict:
+        """Send a prompt to the preferred available provider, hedging if configured"""
+        providers = self._available_providers()
+        if not providers:
+            return self._fallback_analysis()
+        
+        if self.hedge_mode in ('hedge', 'race') and len(providers) > 1:
+            return self._analyze_hedged(prompt, providers)
+        
+        name, analyze = providers[0]
+        return self._timed_analysis(name, analyze, prompt)
+    
+    def _available_providers(self) -> List[tuple]:
+        """Configured providers as (name, method), preferred provider first"""
+        providers = []
+        if self._provider_enabled('openai'):
+            providers.append(('openai', self._analyze_with_openai))
+        if self._provider_enabled('anthropic'):
+            providers.append(('anthropic', self._analyze_with_claude))
+        if self.ai_provider in ('claude', 'anthropic'):
+            providers.reverse()
+        return providers
+    
+    def _provider_enabled(self, name: str) -> bool:
+        """Configured in ai_settings, or a replay stand-in that needs no configuration"""
+        provider = ai_providers.get(name)
+        return bool(provider and (provider.offline or self.ai_settings.get(name)))
+    
+    def _timed_analysis(self, name: str, analyze, prompt: str) -> Dict:
+        """Run one provider and record its latency when it answers"""
+        started = time.monotonic()
+        result = analyze(prompt)
+        elapsed = time.monotonic() - started
+        model = self.ai_settings.get(name, {}).get('model', PROVIDER_DEFAULT_MODELS[name])
+        metrics.provider_latency_seconds.observe(elapsed, provider=name, model=model)
+        if not result.get('fallback'):
+            provider_latency.record(name, elapsed)
+        return result
+    
+    def _hedge_delay(self, provider: str) -> float:
+        """Seconds to wait on the primary before firing the secondary"""
+        observed = provider_latency.percentile(provider, self.hedging.get('percentile', 0.9))
+        if observed is not None:
+            return observed
+        return self.hedging.get('delay_ms', 8000) / 1000
+    
+    def _analyze_hedged(self, prompt: str, providers: List[tuple]) -> Dict:
+        """Return the first valid answer from the primary and secondary providers.
+
+        The losing call cannot be interrupted mid-request; its result is discarded.
+        """
+        (primary, analyze_primary), (secondary, analyze_secondary) = providers[:2]
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            pending = {executor.submit(self._timed_analysis, primary, analyze_primary, prompt)}
+            
+            if self.hedge_mode == 'hedge':
+                done, pending = wait(pending, timeout=self._hedge_delay(primary))
+                for future in done:
+                    result = future.result()
+                    if not result.get('fallback'):
+                        return result
+                print(f"{primary} slow or failed, hedging with {secondary}")
+            
+            pending.add(executor.submit(self._timed_analysis, secondary, analyze_secondary, prompt))
+            for future in as_completed(pending):
+                result = future.result()
+                if not result.get('fallback'):
+                    return result
+            return self._fallback_analysis()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _chunk_fields(self, form_fields: List[Dict]) -> List[List[Dict]]:
+        """Split fillable fields into size-bounded chunks, keeping form sections together"""
+        max_chars = self.ai_settings.get('chunking', {}).get('max_chars', 12000)
+        
+        sections = {}
+        for field in form_fields:
+            if field.get('type') not in NON_FILLABLE_TYPES:
+                sections.setdefault(field.get('section', ''), []).append(field)
+        
+        chunks = []
+        current, current_size = [], 0
+        for group in sections.values():
+            sizes = [len(compact_json(compact_fields([field]))) for field in group]
+            group_size = sum(sizes)
+            if current and current_size + group_size > max_chars:
+                chunks.append(current)
+                current, current_size = [], 0
+            
+            if group_size <= max_chars:
+                current.extend(group)
+                current_size += group_size
+                continue
+            
+            # Section too big on its own: split it field by field
+            for field, size in zip(group, sizes):
+                if current and current_size + size > max_chars:
+                    chunks.append(current)
+                    current, current_size = [], 0
+                current.append(field)
+                current_size += size
+        
+        if current:
+            chunks.append(current)
+        return chunks or [[]]
+    
+    def _analyze_chunks(self, chunks: List[List[Dict]], user_data: Dict) -> tuple:
+        """Analyze chunks on a bounded thread pool and merge their instructions"""
+        max_workers = self.ai_settings.get('chunking', {}).get('max_workers', 4)
+        prompts = [self._create_analysis_prompt(chunk, user_data) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as executor:
+            results = list(executor.map(self._analyze_prompt, prompts))
+        
+        instructions = []
+        seen = set()
+        summaries = []
+        failed_fields = []
+        for chunk, result in zip(chunks, results):
+            if result.get('fallback'):
+                failed_fields.extend(chunk)
+                continue
+            for instruction in result.get('instructions', []):
+                key = (instruction.get('selector'), str(instruction.get('value')))
+                if key not in seen:
+                    seen.add(key)
+                    instructions.append(instruction)
+            if result.get('summary'):
+                summaries.append(result['summary'])
+        
+        if len(failed_fields) == sum(len(chunk) for chunk in chunks):
+            return self._fallback_analysis(), prompts
+        
+        merged = {
+            'instructions': instructions,
+            'summary': ' '.join(summaries)
+        }
+        if failed_fields:
+            # Cover sections whose analysis failed with pattern matching
+            selectors = {instruction.get('selector') for instruction in instructions}
+            for instruction in self._match_with_patterns(failed_fields, user_data):
+                if instruction['selector'] not in selectors:
+                    instructions.append(instruction)
+            merged['incomplete'] = True
+        return merged, prompts
+    
+    def _match_with_patterns(self, form_fields: List[Dict], user_data: Dict) -> List[Dict]:
+        """Build filling instructions from the compiled field pattern index"""
+        values = {}
+        for path, value in flatten_user_data(user_data).items():
+            if value:
+                values.setdefault(path.rsplit('.', 1)[-1], value)
+        
+        instructions = []
+        fillable = [f for f in form_fields if f.get('type') not in NON_FILLABLE_TYPES]
+        for key, field in self.pattern_index.resolve_all(fillable).items():
+            value = values.get(key)
+            if not value:
+                continue
+            if field['tag'] == 'select':
+                method = 'select'
+            elif field.get('type') in ('checkbox', 'radio'):
+                method = 'check'
+            else:
+                method = 'type'
+            instructions.append({
+                'selector': field['selector'],
+                'value': value,
+                'method': method
+            })
+        return instructions
+    
+    def _from_cache(self, cache_key: str, form_fields: List[Dict], user_data: Dict) -> Optional[Dict]:
+        """A cached analysis bound to this user's values, or None to analyze afresh"""
+        cached = form_cache.get(cache_key)
+        if not cached:
+            return None
+        instructions = bind_instructions(cached['instructions'], user_data, form_fields)
+        if instructions is None:
+            return None
+        metrics.analyses_total.inc(outcome='cached')
+        return {
+            'instructions': instructions,
+            'summary': cached.get('summary', ''),
+            'cached': True
+        }
+    
+    def _cache_analysis(self, cache_key: str, analysis: Dict, user_data: Dict, form_fields: List[Dict] = None):
+        """Store the selector/method mapping of an analysis without the user's values"""
+        if not analysis.get('instructions'):
+            return
+        instructions = unbind_instructions(analysis['instructions'], user_data, form_fields)
+        if instructions is None:
+            print("Analysis contains values derived from user data, not caching")
+            return
+        
+        form_cache.put(cache_key, {
+            'instructions': instructions,
+            'summary': analysis.get('summary', '')
+        })
+    
+    def _parse_html(self, html_content: str) -> BeautifulSoup:
+        """Parse HTML with the configured backend, falling back to html.parser"""
+        parser = self.config.get('html_parser') or DEFAULT_HTML_PARSER
+        try:
+            return BeautifulSoup(html_content, parser)
+        except FeatureNotFound:
+            print(f"HTML parser '{parser}' not available, using html.parser")
+            return BeautifulSoup(html_content, 'html.parser')
+    
     def _extract_form_fields(self, soup: BeautifulSoup) -> List[Dict]:
-        """Extract all form fields from HTML"""
-        fields = []
+        """Extract all form fields from HTML in linear time"""
+        # Index labels up front instead of searching the document per field
+        labels_by_for = {}
+        parent_labels = {}
+        for label in soup.find_all('label'):
+            text = label.text.strip()
+            target = label.get('for')
+            if target and target not in labels_by_for:
+                labels_by_for[target] = text
+            # Later (inner) labels overwrite outer ones, matching find_parent
+            for control in label.find_all(FIELD_TAGS):
+                parent_labels[id(control)] = text
         
-        # Find all input fields
-        for element in soup.find_all(['input', 'textarea', 'select']):
+        fields = []
+        section_names = {}
+        for element in soup.find_all(FIELD_TAGS):
+            field_id = element.get('id', '')
+            label = (field_id and labels_by_for.get(field_id)) or parent_labels.get(id(element))
+            if not label:
+                # Look for nearby text
+                prev_sibling = element.find_previous_sibling()
+                if prev_sibling and prev_sibling.name in ['label', 'span', 'div']:
+                    label = prev_sibling.text.strip()
+                else:
+                    label = ''
+            
             field_info = {
                 'tag': element.name,
                 'type': element.get('type', 'text'),
                 'name': element.get('name', ''),
-                'id': element.get('id', ''),
+                'id': field_id,
                 'placeholder': element.get('placeholder', ''),
                 'required': element.get('required') is not None,
-                'label': self._find_label_for_field(soup, element),
+                'label': label,
                 'class': ' '.join(element.get('class', [])),
-                'selector': self._generate_selector(element)
+                'selector': self._generate_selector(element),
+                'section': self._field_section(element, section_names)
             }
             
+            # Limits the filled values are validated against
+            for limit in ('maxlength', 'minlength', 'min', 'max'):
+                if element.get(limit):
+                    field_info[limit] = element[limit]
+            
             # For select elements, get options
             if element.name == 'select':
                 field_info['options'] = [
@@ -141,26 +663,22 @@ class AIFormAnalyzer:
             
         return fields
     
-    def _find_label_for_field(self, soup: BeautifulSoup, field) -> str:
-        """Find the label text for a form field"""
-        # Check for label with 'for' attribute
-        field_id = field.get('id')
-        if field_id:
-            label = soup.find('label', {'for': field_id})
-            if label:
-                return label.text.strip()
-        
-        # Check if field is inside a label
-        parent_label = field.find_parent('label')
-        if parent_label:
-            return parent_label.text.strip()
-        
-        # Look for nearby text
-        prev_sibling = field.find_previous_sibling()
-        if prev_sibling and prev_sibling.name in ['label', 'span', 'div']:
-            return prev_sibling.text.strip()
-            
-        return ''
+    def _field_section(self, element, section_names: Dict) -> str:
+        """Name the form and fieldset an element belongs to"""
+        parts = []
+        for container_tag in ('form', 'fieldset'):
+            container = element.find_parent(container_tag)
+            if container is None:
+                continue
+            key = id(container)
+            if key not in section_names:
+                legend = container.find('legend') if container_tag == 'fieldset' else None
+                section_names[key] = (
+                    (legend.text.strip() if legend else '') or
+                    container.get('id') or container.get('name') or container_tag
+                )
+            parts.append(section_names[key])
+        return ' > '.join(parts)
     
     def _generate_selector(self, element) -> str:
         """Generate a unique CSS selector for the element"""
@@ -181,10 +699,10 @@ class AIFormAnalyzer:
         prompt = f"""Analyze these form fields and match them with the user's data to create filling instructions.
 
 Form Fields:
-{json.dumps(form_fields, indent=2)}
+{compact_json(compact_fields(form_fields))}
 
-User Data:
-{json.dumps(user_data, indent=2)}
+User Data (values shown as @key are elided; use "@key" as the value to fill them):
+{compact_json(compact_user_data(user_data))}
 
 Create a JSON response with filling instructions for each field that should be filled. For each field, provide:
 1. The CSS selector to find the field
@@ -193,7 +711,7 @@ Create a JSON response with filling instructions for each field that should be f
 4. Any special handling instructions
 
 Consider these common scholarship form patterns:
-{json.dumps(self.field_patterns, indent=2)}
+{compact_json(self.field_patterns)}
 
 Response format:
 {{
@@ -214,28 +732,26 @@ Response format:
     
     def _analyze_with_openai(self, prompt: str) -> Dict:
         """Use OpenAI to analyze the form"""
-        if not openai_client:
+        if 'openai' not in ai_providers:
             print("OpenAI client not initialized")
             return self._fallback_analysis()
             
-        if not check_rate_limits():
+        if not check_rate_limits('openai'):
             print("Rate limit exceeded")
             return self._fallback_analysis()
             
         try:
             openai_settings = self.ai_settings.get('openai', {})
-            response = openai_client.chat.completions.create(
+            content = ai_providers['openai'].complete(
+                prompt,
+                system=ANALYSIS_SYSTEM_PROMPT,
+                json_mode=True,
                 model=openai_settings.get('model', 'gpt-4'),
-                messages=[
-                    {"role": "system", "content": "You are an expert at analyzing HTML forms and creating precise filling instructions."},
-                    {"role": "user", "content": prompt}
-                ],
                 temperature=openai_settings.get('temperature', 0.1),
-                max_tokens=openai_settings.get('max_tokens', 4000),
-                response_format={"type": "json_object"}
+                max_tokens=openai_settings.get('max_tokens', 4000)
             )
             
-            return json.loads(response.choices[0].message.content)
+            return json.loads(content)
         except openai.RateLimitError:
             print("OpenAI rate limit exceeded")
             return self._fallback_analysis()
@@ -248,27 +764,24 @@ Response format:
     
     def _analyze_with_claude(self, prompt: str) -> Dict:
         """Use Claude to analyze the form"""
-        if not claude_client:
+        if 'anthropic' not in ai_providers:
             print("Claude client not initialized")
             return self._fallback_analysis()
             
-        if not check_rate_limits():
+        if not check_rate_limits('anthropic'):
             print("Rate limit exceeded")
             return self._fallback_analysis()
             
         try:
             claude_settings = self.ai_settings.get('anthropic', {})
-            response = claude_client.messages.create(
+            content = ai_providers['anthropic'].complete(
+                prompt,
                 model=claude_settings.get('model', 'claude-3-opus-20240229'),
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
                 max_tokens=claude_settings.get('max_tokens', 2000),
                 temperature=claude_settings.get('temperature', 0.1)
             )
             
             # Extract JSON from response
-            content = response.content[0].text
             json_match = re.search(r'\{.*\}', content, re.DOTALL)
             if json_match:
                 try:
@@ -300,17 +813,26 @@ class AIFormFiller:
     
     def __init__(self, config_path='config/autofill.json'):
         """Initialize the form filler with configuration"""
-        try:
-            with open(config_path, 'r') as f:
-                self.config = json.load(f)
-        except Exception as e:
-            print(f"Error loading config: {e}")
-            self.config = {}
+        snapshot = config_registry.get(config_path, required=False)
+        self.config = snapshot.data
             
-        self.analyzer = AIFormAnalyzer()
-        self.field_patterns = self.config.get('field_patterns', {})
+        self.analyzer = AIFormAnalyzer(config_path)
+        self.field_patterns = snapshot.field_patterns
         self.form_filling = self.config.get('form_filling', {})
+        # Precomputed delay table, in seconds; pacing is empty unless human_pacing is on
+        self.delays = snapshot.delays
+        self.pacing = snapshot.pacing
         self.browser_settings = self.config.get('browser_settings', {})
+        # Longest wait for a page or field, in seconds
+        self.timeout = self.browser_settings.get('timeout', 30000) / 1000
+        # Service browsers only need the form DOM: lean unless configured otherwise
+        self.lean = lean_settings(self.browser_settings.get('lean'))
+        
+        # (field type, seconds) for every field filled, reported as metrics
+        self.field_timings = []
+        # Navigation timing of the last form loaded, and time spent waiting for it
+        self.page_load = None
+        self.page_timings = {}
         
         # Initialize browser
         self.driver = None
@@ -318,6 +840,20 @@ class AIFormFiller:
         
     def setup_browser(self):
         """Setup browser with configuration"""
+        self.attach_driver(self.create_driver())
+    
+    def attach_driver(self, driver):
+        """Use an already launched browser, e.g. one checked out from the pool"""
+        self.driver = driver
+        self.wait = WebDriverWait(self.driver, self.timeout, poll_frequency=POLL_INTERVAL)
+    
+    def detach_driver(self):
+        """Release a borrowed browser without quitting it"""
+        self.driver = None
+        self.wait = None
+    
+    def create_driver(self):
+        """Launch a configured browser and return its driver"""
         options = Options()
         
         # Add browser options
@@ -339,19 +875,20 @@ class AIFormFiller:
         options.add_argument('--disable-notifications')
         options.add_argument('--start-maximized')
         
+        if self.browser_settings.get('headless', True):
+            options.add_argument('--headless=new')
+        apply_lean_options(options, self.lean)
+        
         try:
-            self.driver = webdriver.Chrome(options=options)
-            self.wait = WebDriverWait(
-                self.driver, 
-                self.browser_settings.get('timeout', 30000) / 1000
-            )
+            driver = webdriver.Chrome(options=options)
+            enable_request_blocking(driver, self.lean)
             
             # Execute stealth script if enabled
             if self.browser_settings.get('stealth_mode'):
-                self.driver.execute_script(
+                driver.execute_script(
                     "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
                 )
-                self.driver.execute_script("""
+                driver.execute_script("""
                     Object.defineProperty(navigator, 'plugins', {
                         get: () => [1, 2, 3, 4, 5]
                     });
@@ -359,12 +896,16 @@ class AIFormFiller:
                         get: () => ['en-US', 'en']
                     });
                 """)
+            return driver
         except Exception as e:
             print(f"Error setting up browser: {e}")
             raise
             
-    def fill_form(self, form_url: str, user_data: Dict) -> bool:
-        """Fill a form with user data"""
+    def fill_form(self, form_url: str, user_data: Dict, should_stop=None) -> bool:
+        """Fill a form with user data.
+
+        should_stop is polled between fields so a cancelled job stops early.
+        """
         if not self.driver:
             print("Browser not initialized")
             return False
@@ -372,20 +913,40 @@ class AIFormFiller:
         try:
             # Load the form
             self.driver.get(form_url)
-            time.sleep(self.form_filling.get('delays', {}).get('page_load', 2000) / 1000)
+            self.page_timings = wait_for_page(self.driver, self.timeout)
+            pause(self.pacing, 'page_load')
+            self.page_load = page_load_stats(self.driver)
             
-            # Detect form fields
-            fields = self.detect_form_fields()
+            # Analyze the loaded page
+            analysis = self.analyzer.analyze_form_html(self.driver.page_source, user_data)
             
-            # Create data mapping
-            data_mapping = self._create_data_mapping(user_data)
+            # Every format of the user's values, worked out once per profile
+            profile = compile_profile(flatten_user_data(user_data))
             
             # Fill fields
             success = True
-            for field_name, field_info in fields.items():
-                if value := data_mapping.get(field_name):
-                    if not self._fill_field(field_info, value):
-                        success = False
+            for instruction in analysis.get('instructions', []):
+                if should_stop and should_stop():
+                    print("Form filling cancelled")
+                    return False
+                
+                selector = instruction.get('selector')
+                value = instruction.get('value')
+                if not selector or not value:
+                    continue
+                
+                try:
+                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
+                except Exception:
+                    print(f"Field not found: {selector}")
+                    success = False
+                    continue
+                
+                field_info = {'element': element, 'type': self._element_type(element)}
+                value = profile.transform(str(value), instruction.get('transform'), field_info['type'])
+                candidates = profile.options_for_value(value) if field_info['type'] == 'select' else None
+                if not self._fill_field(field_info, value, candidates):
+                    success = False
                         
             return success
             
@@ -393,18 +954,33 @@ class AIFormFiller:
             print(f"Error filling form: {e}")
             return False
             
-    def _fill_field(self, field_info: Dict, value: str) -> bool:
-        """Fill a single field with error handling"""
+    def _element_type(self, element) -> str:
+        """Input type for inputs, tag name for everything else"""
+        tag_name = element.tag_name.lower()
+        if tag_name == 'input':
+            return element.get_attribute('type') or 'text'
+        return tag_name
+    
+    def _fill_field(self, field_info: Dict, value: str, candidates: List[str] = None) -> bool:
+        """Fill a single field, recording how long it took"""
+        started = time.perf_counter()
+        try:
+            return self._fill_field_value(field_info, value, candidates)
+        finally:
+            self.field_timings.append((field_info['type'], time.perf_counter() - started))
+    
+    def _fill_field_value(self, field_info: Dict, value: str, candidates: List[str] = None) -> bool:
+        """Fill a single field with error handling; candidates are other formats of a select's value"""
         try:
             element = field_info['element']
             field_type = field_info['type']
             
-            # Scroll element into view
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(self.form_filling.get('delays', {}).get('scroll', 300) / 1000)
-            
-            # Wait for element to be interactable
-            self.wait.until(EC.element_to_be_clickable(element))
+            # Scroll element into view and wait until it can be used
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+            pause(self.pacing, 'scroll')
+            if not wait_until_interactable(self.driver, element, self.timeout):
+                print("Field never became interactable")
+                return False
             
             # Focus the element
             try:
@@ -414,37 +990,33 @@ class AIFormFiller:
             
             if field_type in ['text', 'email', 'tel', 'number']:
                 element.clear()
-                # Type slowly to mimic human behavior
-                typing_delay = self.form_filling.get('delays', {}).get('typing_speed', 50) / 1000
-                for char in value:
-                    element.send_keys(char)
-                    time.sleep(typing_delay)
+                if self.pacing:
+                    # Type slowly to mimic human behavior
+                    for char in value:
+                        element.send_keys(char)
+                        pause(self.pacing, 'typing_speed')
+                else:
+                    element.send_keys(value)
                     
             elif field_type == 'textarea':
                 element.clear()
-                # Type slowly with natural pauses
-                words = value.split()
-                for word in words:
-                    element.send_keys(word + ' ')
-                    time.sleep(typing_delay * 2)
+                if self.pacing:
+                    # Type slowly with natural pauses
+                    for word in value.split():
+                        element.send_keys(word + ' ')
+                        pause(self.pacing, 'typing_speed', factor=2)
+                else:
+                    element.send_keys(value)
                     
             elif field_type == 'select':
-                select = Select(element)
-                # Try different selection methods
-                try:
-                    select.select_by_visible_text(value)
-                except:
-                    try:
-                        select.select_by_value(value)
-                    except:
-                        # Try partial match
-                        for option in select.options:
-                            if value.lower() in option.text.lower():
-                                select.select_by_visible_text(option.text)
-                                break
+                # Rank all options in the browser in one call
+                choice = select_best_option(self.driver, element, candidates or [value])
+                if not choice:
+                    print(f"No option matches '{value}'")
+                    return False
                                 
             # Wait between fields
-            time.sleep(self.form_filling.get('delays', {}).get('between_fields', 500) / 1000)
+            pause(self.pacing, 'between_fields')
             return True
             
         except Exception as e:
@@ -463,6 +1035,73 @@ class AIFormFiller:
                 self.wait = None
 
 
+def _launch_pooled_browser():
+    """Factory for pooled browsers"""
+    return AIFormFiller().create_driver()
+
+
+# Each autofill worker process owns one warm browser, created by _init_autofill_worker
+browser_pool = None
+
+
+def _init_autofill_worker():
+    """Start the browser owned by this worker process"""
+    global browser_pool
+    browser_pool = BrowserPool(
+        factory=_launch_pooled_browser,
+        max_size=1,
+        min_idle=1,
+        max_uses=int(os.getenv('BROWSER_POOL_MAX_USES', 25))
+    )
+    browser_pool.start()
+    atexit.register(browser_pool.close)
+
+
+def _run_autofill_job(cancel_event, form_url: str, user_data: Dict) -> Dict[str, Any]:
+    """Fill one form inside a worker process"""
+    started = time.time()
+    filler = AIFormFiller()
+    with browser_pool.session() as driver:
+        filler.attach_driver(driver)
+        try:
+            success = filler.fill_form(form_url, user_data, should_stop=cancel_event.is_set)
+            memory = browser_memory(driver)
+        finally:
+            filler.detach_driver()
+    
+    return {
+        'success': success,
+        'duration': round(time.time() - started, 3),
+        'fieldTimings': filler.field_timings,
+        'pageLoad': filler.page_load,
+        'pageWaits': filler.page_timings,
+        'browserMemory': memory,
+        'script': filler.config
+    }
+
+
+def _record_autofill_result(result: Dict[str, Any]):
+    """Report a finished job's fill timings and browser footprint in this process's metrics"""
+    for field_type, seconds in result.get('fieldTimings', []):
+        metrics.fill_field_seconds.observe(seconds, type=field_type)
+    if result.get('pageLoad'):
+        metrics.page_load_seconds.observe(result['pageLoad']['domContentLoadedMs'] / 1000)
+    if result.get('browserMemory'):
+        metrics.browser_rss_bytes.observe(result['browserMemory']['rssBytes'])
+
+
+# Browser work runs in separate processes so the HTTP tier stays responsive
+autofill_jobs = JobQueue(
+    _run_autofill_job,
+    store_path=os.getenv('AUTOFILL_JOBS_DB', 'cache/autofill_jobs.db'),
+    max_workers=int(os.getenv('AUTOFILL_WORKERS', 2)),
+    initializer=_init_autofill_worker,
+    on_result=_record_autofill_result,
+    result_ttl=float(os.getenv('AUTOFILL_JOB_TTL', 3600))
+)
+atexit.register(autofill_jobs.shutdown)
+
+
 @app.route('/api/analyze-form', methods=['POST'])
 def analyze_form():
     """Analyze form HTML sent from browser extension"""
@@ -472,8 +1111,11 @@ def analyze_form():
         user_data = data.get('userData', {})
         form_url = data.get('url', '')
         
-        # Use AI to analyze the form
-        analyzer = AIFormAnalyzer(ai_provider='openai')  # or 'claude'
+        # Use AI to analyze the form; premium API keys race both providers
+        analyzer = AIFormAnalyzer(
+            ai_provider='openai',  # or 'claude'
+            hedge_mode='race' if request.headers.get('X-API-Key') in PREMIUM_API_KEYS else None
+        )
         analysis = analyzer.analyze_form_html(html_content, user_data)
         
         return jsonify({
@@ -490,23 +1132,128 @@ def analyze_form():
         }), 500
 
 
+@app.route('/api/analyze-forms', methods=['POST'])
+def analyze_forms():
+    """Analyze many forms at once, analyzing identical form structures only once"""
+    try:
+        data = request.json or {}
+        items = data.get('items', [])
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'error': 'items must be a non-empty list'
+            }), 400
+        if len(items) > MAX_BATCH_ITEMS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_BATCH_ITEMS} items per batch'
+            }), 400
+        
+        analyzer = AIFormAnalyzer(ai_provider='openai')
+        results = analyzer.analyze_form_batch(
+            [{'html': item.get('html', ''), 'user_data': item.get('userData', {})} for item in items],
+            max_workers=BATCH_MAX_WORKERS
+        )
+        
+        response = []
+        for index, (item, result) in enumerate(zip(items, results)):
+            entry = {'id': item.get('id', index), 'success': result['success']}
+            if result['success']:
+                entry['analysis'] = result['analysis']
+                entry['fillingInstructions'] = result['analysis'].get('instructions', [])
+            else:
+                entry['error'] = result['error']
+            response.append(entry)
+        
+        return jsonify({
+            'success': True,
+            'results': response
+        })
+        
+    except Exception as e:
+        print(f"Error analyzing form batch: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/analyze-form/stream', methods=['POST'])
+def analyze_form_stream():
+    """Stream filling instructions as NDJSON, or SSE when the client accepts text/event-stream"""
+    data = request.json or {}
+    html_content = data.get('html', '')
+    user_data = data.get('userData', {})
+    use_sse = 'text/event-stream' in request.headers.get('Accept', '')
+    
+    analyzer = AIFormAnalyzer(ai_provider='openai')
+    
+    def generate():
+        try:
+            for event, payload in analyzer.stream_form_analysis(html_content, user_data):
+                body = {'type': event, event: payload}
+                if use_sse:
+                    yield f"event: {event}\ndata: {json.dumps(body)}\n\n"
+                else:
+                    yield json.dumps(body) + "\n"
+        except Exception as e:
+            print(f"Error streaming form analysis: {e}")
+            body = {'type': 'error', 'error': str(e)}
+            if use_sse:
+                yield f"event: error\ndata: {json.dumps(body)}\n\n"
+            else:
+                yield json.dumps(body) + "\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if use_sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics for the analysis and fill pipeline"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/rate-limits', methods=['GET'])
+def rate_limits():
+    """Current AI provider budget utilization"""
+    try:
+        return jsonify({
+            'success': True,
+            'rateLimits': rate_limiter.utilization()
+        })
+    except Exception as e:
+        print(f"Error reading rate limits: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/prepare-autofill', methods=['POST'])
 def prepare_autofill():
-    """Prepare autofill script for a scholarship"""
+    """Queue an autofill job for a scholarship and return its id"""
     try:
         data = request.json
         form_url = data.get('formUrl', '')
         user_data = data.get('userData', {})
         
-        # Create smart filling script
-        filler = AIFormFiller()
-        filler.setup_browser()
-        success = filler.fill_form(form_url, user_data)
+        if not form_url:
+            return jsonify({
+                'success': False,
+                'error': 'formUrl is required'
+            }), 400
+        
+        job_id = autofill_jobs.submit(form_url, user_data)
         
         return jsonify({
-            'success': success,
-            'script': filler.config
-        })
+            'success': True,
+            'jobId': job_id,
+            'status': 'queued'
+        }), 202
         
     except Exception as e:
         print(f"Error preparing autofill: {e}")
@@ -516,40 +1263,109 @@ def prepare_autofill():
         }), 500
 
 
+@app.route('/api/autofill-jobs/<job_id>', methods=['GET'])
+def autofill_job_status(job_id):
+    """Poll the status and result of an autofill job"""
+    status = autofill_jobs.status(job_id)
+    if status is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown job'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **status
+    })
+
+
+@app.route('/api/autofill-jobs/<job_id>/cancel', methods=['POST'])
+def cancel_autofill_job(job_id):
+    """Cancel a queued or running autofill job"""
+    if not autofill_jobs.cancel(job_id):
+        return jsonify({
+            'success': False,
+            'error': 'Job not found or already finished'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'jobId': job_id,
+        'status': 'cancelling'
+    })
+
+
+def _judge_free_text(results: List[Dict], values: Dict[str, str], settings: Dict) -> bool:
+    """Ask a model whether undecided free-text answers fit their fields; updates results in place.
+
+    settings are the configured OpenAI ai_settings (model, temperature).
+    """
+    undecided = [result for result in results if result['status'] == UNDECIDED]
+    if not undecided or 'openai' not in ai_providers:
+        return False
+    if not check_rate_limits('openai'):
+        print("Rate limit exceeded, leaving free text undecided")
+        return False
+    
+    prompt = f"""Judge whether each answer on a scholarship application responds to its field.
+Only judge relevance and coherence; format and length were already checked.
+
+Fields:
+{compact_json([{'selector': r['selector'], 'label': r['label'], 'value': values.get(r['selector'], '')} for r in undecided])}
+
+Return JSON: {{"fields": [{{"selector": "...", "valid": true|false, "reason": "short reason"}}]}}
+"""
+    try:
+        content = ai_providers['openai'].complete(
+            prompt,
+            json_mode=True,
+            model=settings.get('model', PROVIDER_DEFAULT_MODELS['openai']),
+            temperature=settings.get('temperature', 0.1)
+        )
+        judgments = {item.get('selector'): item for item in json.loads(content).get('fields', [])}
+    except Exception as e:
+        print(f"Free-text validation failed: {e}")
+        return False
+    
+    judged = False
+    for result in undecided:
+        judgment = judgments.get(result['selector'])
+        if not judgment or not isinstance(judgment.get('valid'), bool):
+            continue
+        judged = True
+        result['status'] = PASS if judgment['valid'] else FAIL
+        if not judgment['valid']:
+            result['errors'].append({'code': 'irrelevant', 'message': judgment.get('reason', '')})
+    return judged
+
+
 @app.route('/api/validate-filled-form', methods=['POST'])
 def validate_filled_form():
-    """Validate that form was filled correctly"""
+    """Validate that form was filled correctly.
+
+    Rules decide required fields, formats, select options and length limits
+    locally; only free-text answers that pass them are sent to a model, and
+    only when the request allows it ("escalate", default true).
+    """
     try:
-        data = request.json
+        data = request.json or {}
         filled_fields = data.get('filledFields', [])
         expected_fields = data.get('expectedFields', [])
+        analyzer = AIFormAnalyzer()
+        if not expected_fields and data.get('html'):
+            expected_fields = analyzer._extract_form_fields(analyzer._parse_html(data['html']))
         
-        # Use AI to validate the filling
-        validation_prompt = f"""
-        Validate if the form was filled correctly.
-        
-        Expected fields: {json.dumps(expected_fields)}
-        Filled fields: {json.dumps(filled_fields)}
-        
-        Check for:
-        1. All required fields are filled
-        2. Values match the expected format
-        3. No obvious errors or mismatches
-        
-        Return a validation report.
-        """
-        
-        # Get AI validation
-        validation = openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": validation_prompt}],
-            temperature=0.1
-        )
+        validation = validate_form(filled_fields, expected_fields)
+        if data.get('escalate', True) and not validation['complete']:
+            values = {f.get('selector'): f.get('value') for f in filled_fields if f.get('selector')}
+            if _judge_free_text(validation['fields'], values, analyzer.ai_settings.get('openai', {})):
+                validation = verdict(validation['fields'], decided_by='local+llm')
+        metrics.validations_total.inc(decided_by=validation['decidedBy'])
         
         return jsonify({
             'success': True,
-            'validation': validation.choices[0].message.content,
-            'isValid': True  # Parse from AI response
+            'validation': validation,
+            'isValid': validation['isValid']
         })
         
     except Exception as e:
@@ -1,17 +1,115 @@
 import json
-import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (TimeoutException, WebDriverException, InvalidSessionIdException,
+                                        NoSuchWindowException)
 import openai
 from bs4 import BeautifulSoup
 import os
+from config_registry import config_registry
+from llm_providers import create_provider
+from browser_profile import lean_settings, apply_lean_options, enable_request_blocking
+from page_waits import POLL_INTERVAL, pause, wait_for_page, wait_until_interactable
+from selector_memory import VALIDATE_SELECTORS_SCRIPT, default_selector_memory
+from profile_variants import CompiledProfile, compile_profile
+from select_options import MATCH_OPTION_JS, MIN_OPTION_SCORE, select_best_option
+
+# Collects every form control in the current frame with the attributes used for
+# matching and a stable selector, plus the visible child frames to descend into,
+# so each frame costs one WebDriver round trip
+FIELD_SNAPSHOT_SCRIPT = """
+const escape = (value) => (window.CSS && CSS.escape) ? CSS.escape(value)
+    : value.replace(/([^a-zA-Z0-9_-])/g, '\\\\$1');
+const labelFor = {};
+document.querySelectorAll('label[for]').forEach((label) => {
+    if (!(label.htmlFor in labelFor)) labelFor[label.htmlFor] = label.textContent.trim();
+});
+const pathTo = (el) => {
+    const parts = [];
+    while (el && el.nodeType === 1 && el !== document.documentElement) {
+        let index = 1;
+        for (let sib = el.previousElementSibling; sib; sib = sib.previousElementSibling) {
+            if (sib.tagName === el.tagName) index++;
+        }
+        parts.unshift(el.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+        el = el.parentElement;
+    }
+    return parts.join(' > ');
+};
+const fields = Array.from(document.querySelectorAll('input, textarea, select')).map((el) => {
+    const tag = el.tagName.toLowerCase();
+    const name = el.getAttribute('name') || '';
+    let label = (el.id && labelFor[el.id]) || '';
+    if (!label) {
+        const parent = el.closest('label');
+        if (parent) label = parent.textContent.trim();
+    }
+    let selector;
+    if (el.id) selector = '#' + escape(el.id);
+    else if (name) selector = tag + '[name="' + name.replace(/"/g, '\\\\"') + '"]';
+    else selector = pathTo(el);
+    return {
+        element: el,
+        tag: tag,
+        type: tag === 'input' ? (el.getAttribute('type') || 'text').toLowerCase() : tag,
+        name: name,
+        id: el.id || '',
+        placeholder: el.getAttribute('placeholder') || '',
+        label: label,
+        selector: selector
+    };
+});
+const frames = [];
+document.querySelectorAll('iframe, frame').forEach((frame, index) => {
+    const rect = frame.getBoundingClientRect();
+    if (rect.width > 0 && rect.height > 0) frames.push({element: frame, index: index});
+});
+return {fields: fields, frames: frames};
+"""
+
+# Nested frames deeper than this are not searched for fields
+MAX_FRAME_DEPTH = 4
+
+# Assigns every value in one call through the native value setters and fires
+# input/change events so framework-bound forms (React, Vue, Angular) see them;
+# selects pick their best-ranked option for any of the value's formats
+FAST_FILL_SCRIPT = MATCH_OPTION_JS + """
+const fire = (el, type) => el.dispatchEvent(new Event(type, {bubbles: true}));
+const setNative = (el, value) => {
+    const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    setter.call(el, value);
+};
+return arguments[0].map((item) => {
+    const el = item.element;
+    const value = item.value;
+    try {
+        if (item.type === 'file') {
+            return {ok: false, error: 'file inputs cannot be set from script'};
+        }
+        if (item.type === 'select') {
+            return chooseOption(el, item.candidates || [value], arguments[1]);
+        }
+        if (item.type === 'checkbox' || item.type === 'radio') {
+            if (!el.checked) el.click();
+            return {ok: el.checked, value: String(el.checked)};
+        }
+        el.focus();
+        setNative(el, value);
+        fire(el, 'input');
+        fire(el, 'change');
+        el.blur();
+        return {ok: el.value === value, value: el.value};
+    } catch (e) {
+        return {ok: false, error: String(e)};
+    }
+});
+"""
 
 @dataclass
 class UserData:
@@ -21,6 +119,7 @@ class UserData:
     contact_info: Dict[str, str] = None
     essays: Dict[str, str] = None
     files: Dict[str, str] = None
+    compiled: Optional[CompiledProfile] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         """Initialize default values for None fields"""
@@ -32,8 +131,8 @@ class UserData:
 
     @classmethod
     def from_profile(cls, profile_data: Dict[str, Any]):
-        """Create UserData instance from profile data"""
-        return cls(
+        """Create a compiled UserData instance from profile data"""
+        user_data = cls(
             personal_info={
                 'first_name': profile_data.get('firstName', ''),
                 'last_name': profile_data.get('lastName', ''),
@@ -50,6 +149,7 @@ class UserData:
                 'major': profile_data.get('major', ''),
                 'minor': profile_data.get('minor', ''),
                 'gpa': str(profile_data.get('gpa', '')),
+                'gpa_scale': str(profile_data.get('gpaScale', '')),
                 'graduation_year': str(profile_data.get('graduationYear', '')),
                 'sat_total': str(profile_data.get('testScores', {}).get('sat', {}).get('total', '')),
                 'sat_math': str(profile_data.get('testScores', {}).get('sat', {}).get('math', '')),
@@ -68,6 +168,62 @@ class UserData:
                 'country': profile_data.get('address', {}).get('country', 'United States'),
             }
         )
+        user_data.compile()
+        return user_data
+
+    def field_values(self) -> Dict[str, Any]:
+        """Values keyed by the form field names in the config"""
+        mapping = {}
+        
+        # Personal Information
+        mapping.update({
+            'first_name': self.personal_info.get('first_name', ''),
+            'last_name': self.personal_info.get('last_name', ''),
+            'full_name': f"{self.personal_info.get('first_name', '')} {self.personal_info.get('last_name', '')}",
+            'email': self.personal_info.get('email', ''),
+            'phone': self.personal_info.get('phone', ''),
+            'date_of_birth': self.personal_info.get('date_of_birth', ''),
+            'citizenship': self.personal_info.get('citizenship', ''),
+            'gender': self.personal_info.get('gender', ''),
+            'ethnicity': self.personal_info.get('ethnicity', []),
+        })
+        
+        # Academic Information
+        mapping.update({
+            'school': self.academic_info.get('school', ''),
+            'school_year': self.academic_info.get('school_year', ''),
+            'major': self.academic_info.get('major', ''),
+            'minor': self.academic_info.get('minor', ''),
+            'gpa': self.academic_info.get('gpa', ''),
+            'gpa_scale': self.academic_info.get('gpa_scale', ''),
+            'graduation_year': self.academic_info.get('graduation_year', ''),
+            'sat_total': self.academic_info.get('sat_total', ''),
+            'sat_math': self.academic_info.get('sat_math', ''),
+            'sat_reading': self.academic_info.get('sat_reading', ''),
+            'act_composite': self.academic_info.get('act_composite', ''),
+            'act_english': self.academic_info.get('act_english', ''),
+            'act_math': self.academic_info.get('act_math', ''),
+            'act_reading': self.academic_info.get('act_reading', ''),
+            'act_science': self.academic_info.get('act_science', ''),
+        })
+        
+        # Contact Information
+        mapping.update({
+            'address': self.contact_info.get('street', ''),
+            'street': self.contact_info.get('street', ''),
+            'city': self.contact_info.get('city', ''),
+            'state': self.contact_info.get('state', ''),
+            'zip': self.contact_info.get('zip_code', ''),
+            'zip_code': self.contact_info.get('zip_code', ''),
+            'country': self.contact_info.get('country', ''),
+        })
+        
+        return mapping
+
+    def compile(self) -> CompiledProfile:
+        """Work out every value's format variants once; cached by profile hash"""
+        self.compiled = compile_profile(self.field_values())
+        return self.compiled
 
 class AIFormFiller:
     def __init__(self, config_file: str = 'ai.json', openai_api_key: str = None):
@@ -75,19 +231,51 @@ class AIFormFiller:
         self.driver = None
         self.wait = None
         self.openai_client = openai.OpenAI(api_key=openai_api_key) if openai_api_key else None
+        # Live, recording or replaying depending on LLM_PROVIDER_MODE
+        self.llm = create_provider('openai', self.openai_client)
         
-        # Load configuration
-        with open(config_file, 'r') as f:
-            self.config = json.load(f)['config']
+        # Load configuration once per process; reloaded when the file changes
+        snapshot = config_registry.get(config_file)
+        self.config = snapshot.settings
         
         # Extract configuration values
         self.field_patterns = self.config['form_fields']
+        self.pattern_index = snapshot.pattern_index
         self.browser_options = self.config['selenium']['browser_options']
-        self.delays = self.config['delays']
+        # Opt-in here; the service runs lean by default
+        self.lean = lean_settings(self.config['selenium'].get('lean', False))
+        self.delays = snapshot.delays
+        # Empty unless human_pacing is enabled in the config
+        self.pacing = snapshot.pacing
         self.selectors = self.config['selectors']
+        self.last_fill_report = {}
+        # Seconds spent in each readiness wait for the last page loaded
+        self.page_timings = {}
+        # Frame elements found by the last snapshot, keyed by frame path, and
+        # the frame the driver is currently switched into
+        self._frame_elements = {}
+        self._current_frame = ()
+        # Selectors that filled fields on earlier visits, per domain and path
+        self.selector_memory = default_selector_memory()
 
     def setup_browser(self):
         """Setup Chrome browser with stealth configuration"""
+        self.attach_driver(self.create_driver())
+
+    def attach_driver(self, driver):
+        """Use an already launched browser, e.g. one checked out from a pool"""
+        self.driver = driver
+        self._frame_elements = {}
+        self._current_frame = ()
+        self.wait = WebDriverWait(self.driver, self.config['selenium']['timeout'], poll_frequency=POLL_INTERVAL)
+
+    def detach_driver(self):
+        """Release a borrowed browser without quitting it"""
+        self.driver = None
+        self.wait = None
+
+    def create_driver(self):
+        """Launch a configured Chrome and return its driver"""
         options = Options()
         
         # Add browser options from config
@@ -105,17 +293,18 @@ class AIFormFiller:
         options.add_argument('--disable-popup-blocking')
         options.add_argument('--disable-notifications')
         options.add_argument('--start-maximized')
+        apply_lean_options(options, self.lean)
         
-        self.driver = webdriver.Chrome(options=options)
-        self.wait = WebDriverWait(self.driver, self.config['selenium']['timeout'])
+        driver = webdriver.Chrome(options=options)
+        enable_request_blocking(driver, self.lean)
         
         # Execute stealth script
         if self.config['selenium']['stealth_mode']:
-            self.driver.execute_script(
+            driver.execute_script(
                 "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
             )
             # Additional stealth configurations
-            self.driver.execute_script("""
+            driver.execute_script("""
                 Object.defineProperty(navigator, 'plugins', {
                     get: () => [1, 2, 3, 4, 5]
                 });
@@ -123,10 +312,11 @@ class AIFormFiller:
                     get: () => ['en-US', 'en']
                 });
             """)
+        return driver
 
     def analyze_form_with_ai(self, html_content: str) -> Dict[str, str]:
         """Use OpenAI to analyze form structure and suggest field mappings"""
-        if not self.openai_client:
+        if not self.llm:
             return {}
         
         prompt = f"""
@@ -152,13 +342,12 @@ class AIFormFiller:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
+            response_text = self.llm.complete(
+                prompt,
                 model=self.config['ai']['model'],
-                messages=[{"role": "user", "content": prompt}],
                 temperature=self.config['ai']['temperature']
             )
             
-            response_text = response.choices[0].message.content
             # Extract JSON from response
             import re
             json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
@@ -169,8 +358,22 @@ class AIFormFiller:
         
         return {}
 
-    def detect_form_fields(self) -> Dict[str, Any]:
-        """Detect form fields using multiple strategies"""
+    def detect_form_fields(self, url: str = None) -> Dict[str, Any]:
+        """Detect form fields using multiple strategies.
+
+        Selectors remembered from earlier fills of the same page are tried
+        first; when all of them still match, AI analysis is skipped and only
+        fields without a remembered selector are pattern matched.
+        """
+        if url is None:
+            url = self._page_url()
+        remembered = self._recall_fields(url)
+        if remembered is not None:
+            matched = self._match_unremembered(remembered)
+            print(f"Using {len(remembered)} remembered field selectors, {len(matched)} fields found by pattern")
+            remembered.update(matched)
+            return remembered
+        
         fields_found = {}
         
         # Get page source for AI analysis
@@ -179,57 +382,196 @@ class AIFormFiller:
         # Try AI-powered detection first
         ai_mappings = self.analyze_form_with_ai(html_content)
         
+        # Collect every field on the page in a single round trip
+        snapshot = self._snapshot_form_fields()
+        by_selector = {field['selector']: field for field in snapshot}
+        pattern_matches = self.pattern_index.resolve_all(snapshot)
+        
         # Process each category of fields
         for category, fields in self.field_patterns.items():
-            for field_name, patterns in fields.items():
-                element = None
-                selector = None
+            for field_name in fields:
+                match = None
                 
                 # Check AI suggestions first
                 if field_name in ai_mappings:
-                    try:
-                        element = self.driver.find_element(By.CSS_SELECTOR, ai_mappings[field_name])
-                        selector = ai_mappings[field_name]
-                    except:
-                        pass
+                    selector = ai_mappings[field_name]
+                    match = by_selector.get(selector)
+                    if not match:
+                        try:
+                            element = self.driver.find_element(By.CSS_SELECTOR, selector)
+                            match = {
+                                'element': element,
+                                'selector': selector,
+                                'type': self._get_element_type(element),
+                                'frame': []
+                            }
+                        except:
+                            pass
                 
-                # Fallback to pattern matching
-                if not element:
-                    element, selector = self._find_element_by_patterns(patterns)
+                # Fallback to pattern matching against the snapshot
+                if not match:
+                    match = pattern_matches.get(field_name)
                 
-                if element:
+                if match:
                     fields_found[field_name] = {
-                        'element': element,
-                        'selector': selector,
-                        'type': self._get_element_type(element)
+                        'element': match['element'],
+                        'selector': match['selector'],
+                        'type': match['type'],
+                        'frame': match.get('frame', [])
                     }
         
         return fields_found
 
-    def _find_element_by_patterns(self, patterns: List[str]) -> tuple:
-        """Find element using common naming patterns"""
-        for pattern in patterns:
-            # Try different selector strategies
-            selectors = [
-                f"input[name='{pattern}']",
-                f"input[id='{pattern}']",
-                f"input[name*='{pattern}']",
-                f"input[id*='{pattern}']",
-                f"textarea[name='{pattern}']",
-                f"textarea[id='{pattern}']",
-                f"select[name='{pattern}']",
-                f"select[id='{pattern}']",
-                f"input[placeholder*='{pattern}']"
-            ]
-            
-            for selector in selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    return element, selector
-                except NoSuchElementException:
-                    continue
+    def _page_url(self) -> str:
+        try:
+            return self.driver.current_url
+        except Exception:
+            return ''
+
+    def _match_unremembered(self, remembered: Dict[str, Any]) -> Dict[str, Any]:
+        """Pattern matches, from one page snapshot, for configured fields with no remembered selector"""
+        known = {name for fields in self.field_patterns.values() for name in fields}
+        if known.issubset(remembered):
+            return {}
+        
+        # Elements already claimed by a remembered field can't fill another
+        claimed = {(tuple(field['frame']), field['selector']) for field in remembered.values()}
+        snapshot = [field for field in self._snapshot_form_fields()
+                    if (tuple(field.get('frame', [])), field['selector']) not in claimed]
+        return {
+            field_name: {
+                'element': match['element'],
+                'selector': match['selector'],
+                'type': match['type'],
+                'frame': match.get('frame', [])
+            }
+            for field_name, match in self.pattern_index.resolve_all(snapshot).items()
+            if field_name in known and field_name not in remembered
+        }
+
+    def _recall_fields(self, url: str) -> Optional[Dict[str, Any]]:
+        """Remembered fields of this page that still match, or None to detect afresh.
+
+        The selectors are checked in one script call per frame. Any that no
+        longer match are counted as failures and trigger a full detection.
+        """
+        if not self.selector_memory or not url:
+            return None
+        known = {name for fields in self.field_patterns.values() for name in fields}
+        remembered = {name: entry for name, entry in self.selector_memory.lookup(url).items()
+                      if name in known}
+        if not remembered:
+            return None
+        
+        found = {}
+        stale = {}
+        self.driver.switch_to.default_content()
+        self._current_frame = ()
+        self._frame_elements = {}
+        for frame, entries in self._group_by_frame(remembered):
+            try:
+                self._enter_frame(frame)
+                results = self.driver.execute_script(
+                    VALIDATE_SELECTORS_SCRIPT, [entry['selector'] for _, entry in entries])
+            except Exception as e:
+                print(f"Could not check remembered selectors in frame {frame}: {e}")
+                results = [None] * len(entries)
+            for (field_name, entry), result in zip(entries, results):
+                if result:
+                    found[field_name] = {
+                        'element': result['element'],
+                        'selector': entry['selector'],
+                        'type': result['type'],
+                        'frame': frame
+                    }
+                else:
+                    stale[field_name] = {'selector': entry['selector'], 'frame': frame, 'success': False}
+        self._enter_frame([])
+        
+        if stale:
+            print(f"{len(stale)} remembered selectors no longer match, detecting fields again")
+            self.selector_memory.record(url, stale)
+            return None
+        return found
+
+    def _remember_fields(self, url: str, fields: Dict[str, Any], succeeded: Dict[str, bool]):
+        """Store which selectors filled their field, and count the ones that failed"""
+        if not self.selector_memory or not url:
+            return
+        self.selector_memory.record(url, {
+            field_name: {
+                'selector': fields[field_name]['selector'],
+                'frame': fields[field_name].get('frame', []),
+                'success': success
+            }
+            for field_name, success in succeeded.items()
+            if fields[field_name].get('selector')
+        })
+
+    def _snapshot_form_fields(self) -> List[Dict[str, Any]]:
+        """Collect the fields of every frame on the page in a single walk of the frame tree.
+
+        Each field carries its frame path: the indices of the iframe/frame
+        elements leading to it from the top document ([] for the top itself).
+        """
+        self.driver.switch_to.default_content()
+        self._current_frame = ()
+        self._frame_elements = {}
+        fields = []
+        self._snapshot_frame((), fields)
+        return fields
+
+    def _snapshot_frame(self, path: tuple, fields: List[Dict[str, Any]]):
+        """Snapshot the current frame, then each visible child frame in turn"""
+        try:
+            snapshot = self.driver.execute_script(FIELD_SNAPSHOT_SCRIPT) or {}
+        except Exception as e:
+            print(f"Field snapshot failed in frame {list(path)}: {e}")
+            return
+        
+        for field in snapshot.get('fields', []):
+            field['frame'] = list(path)
+            fields.append(field)
+        
+        if len(path) >= MAX_FRAME_DEPTH:
+            return
+        for frame in snapshot.get('frames', []):
+            child = path + (frame['index'],)
+            try:
+                self.driver.switch_to.frame(frame['element'])
+            except Exception as e:
+                print(f"Could not enter frame {list(child)}: {e}")
+                continue
+            self._frame_elements[child] = frame['element']
+            self._current_frame = child
+            self._snapshot_frame(child, fields)
+            self.driver.switch_to.parent_frame()
+            self._current_frame = path
+
+    def _enter_frame(self, path: List[int]):
+        """Switch to the frame at path, climbing only as far as the common ancestor"""
+        path = tuple(path)
+        if path == self._current_frame:
+            return
+        
+        common = 0
+        while (common < min(len(path), len(self._current_frame)) and
+               path[common] == self._current_frame[common]):
+            common += 1
+        if common == 0:
+            self.driver.switch_to.default_content()
+        else:
+            for _ in range(len(self._current_frame) - common):
+                self.driver.switch_to.parent_frame()
+        self._current_frame = path[:common]
         
-        return None, None
+        for depth in range(common, len(path)):
+            prefix = path[:depth + 1]
+            frame = self._frame_elements.get(prefix)
+            if frame is None:
+                frame = self.driver.find_elements(By.CSS_SELECTOR, 'iframe, frame')[prefix[-1]]
+            self.driver.switch_to.frame(frame)
+            self._current_frame = prefix
 
     def _get_element_type(self, element) -> str:
         """Determine the type of form element"""
@@ -255,32 +597,31 @@ class AIFormFiller:
                 except:
                     pass
                 
-                # Sometimes forms are in iframes
-                iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-                if iframes:
-                    for iframe in iframes:
-                        try:
-                            self.driver.switch_to.frame(iframe)
-                            if self.driver.find_elements(By.TAG_NAME, "form"):
-                                print("Found form in iframe")
-                                break
-                        except:
-                            self.driver.switch_to.default_content()
-                
+                # Forms inside iframes are found by the frame-aware field snapshot
                 return True
             except Exception as e:
                 print(f"Error in National Merit form handling: {e}")
-                self.driver.switch_to.default_content()
                 return False
         return True
 
-    def fill_form(self, url: str, user_data: UserData) -> bool:
-        """Main method to fill a form at the given URL"""
+    def fill_form(self, url: str, user_data: UserData, fast_fill: bool = None) -> bool:
+        """Main method to fill a form at the given URL.
+
+        With fast_fill (or "fast_fill" in the config) every value is assigned in
+        a single script call instead of being typed; the per-field outcome is
+        kept in self.last_fill_report. Browser errors (WebDriverException) are
+        raised rather than reported as False, so callers can retry them on a
+        fresh browser.
+        """
+        if fast_fill is None:
+            fast_fill = self.config.get('fast_fill', False)
+        
         try:
             # Navigate to the form
             print(f"Navigating to: {url}")
             self.driver.get(url)
-            time.sleep(self.delays['page_load'])
+            self.page_timings = wait_for_page(self.driver, self.config['selenium']['timeout'])
+            pause(self.pacing, 'page_load')
             
             # Handle special cases
             if not self._handle_national_merit_form(url):
@@ -289,7 +630,8 @@ class AIFormFiller:
             
             # Detect form fields
             print("Analyzing form structure...")
-            fields = self.detect_form_fields()
+            page_url = self._page_url() or url
+            fields = self.detect_form_fields(page_url)
             
             if not fields:
                 print("No form fields detected!")
@@ -298,75 +640,123 @@ class AIFormFiller:
             print(f"Found {len(fields)} form fields")
             
             # Create data mapping
-            data_mapping = self._create_data_mapping(user_data)
+            profile = user_data.compile()
+            data_mapping = profile.values
+            
+            if fast_fill:
+                report = self.fast_fill_fields(fields, data_mapping, profile)
+                filled_count = sum(1 for result in report.values() if result['success'])
+                print(f"Fast-filled {filled_count} out of {len(report)} fields")
+                self._remember_fields(page_url, fields, {
+                    field_name: result['success'] for field_name, result in report.items()
+                })
+                return filled_count > 0
             
-            # Fill each detected field
-            filled_count = 0
-            for field_name, field_info in fields.items():
-                if field_name in data_mapping and data_mapping[field_name]:
-                    print(f"Filling {field_name}...")
-                    if self.fill_form_field(field_info, data_mapping[field_name]):
-                        filled_count += 1
-                        time.sleep(self.delays['between_actions'])
-                    else:
-                        print(f"Failed to fill {field_name}")
+            # Fill each detected field, one frame at a time
+            filled = {}
+            for frame, frame_fields in self._group_by_frame(fields):
+                self._enter_frame(frame)
+                for field_name, field_info in frame_fields:
+                    if field_name in data_mapping and data_mapping[field_name]:
+                        print(f"Filling {field_name}...")
+                        value = profile.value_for(field_name, field_info['type'])
+                        filled[field_name] = self.fill_form_field(
+                            field_info, value, profile.options_for(field_name))
+                        if filled[field_name]:
+                            pause(self.pacing, 'between_actions')
+                        else:
+                            print(f"Failed to fill {field_name}")
             
+            filled_count = sum(1 for success in filled.values() if success)
+            self._remember_fields(page_url, fields, filled)
             print(f"Successfully filled {filled_count} out of {len(fields)} fields")
             return filled_count > 0
             
+        except (WebDriverException, ConnectionError):
+            raise
         except Exception as e:
             print(f"Error filling form: {e}")
             import traceback
             traceback.print_exc()
             return False
+        finally:
+            try:
+                self._enter_frame([])
+            except Exception:
+                pass
 
-    def _create_data_mapping(self, user_data: UserData) -> Dict[str, str]:
-        """Create mapping between form fields and user data"""
-        mapping = {}
-        
-        # Personal Information
-        mapping.update({
-            'first_name': user_data.personal_info.get('first_name', ''),
-            'last_name': user_data.personal_info.get('last_name', ''),
-            'full_name': f"{user_data.personal_info.get('first_name', '')} {user_data.personal_info.get('last_name', '')}",
-            'email': user_data.personal_info.get('email', ''),
-            'phone': user_data.personal_info.get('phone', ''),
-            'date_of_birth': user_data.personal_info.get('date_of_birth', ''),
-            'citizenship': user_data.personal_info.get('citizenship', ''),
-            'gender': user_data.personal_info.get('gender', ''),
-            'ethnicity': user_data.personal_info.get('ethnicity', []),
-        })
-        
-        # Academic Information
-        mapping.update({
-            'school': user_data.academic_info.get('school', ''),
-            'school_year': user_data.academic_info.get('school_year', ''),
-            'major': user_data.academic_info.get('major', ''),
-            'minor': user_data.academic_info.get('minor', ''),
-            'gpa': user_data.academic_info.get('gpa', ''),
-            'graduation_year': user_data.academic_info.get('graduation_year', ''),
-            'sat_total': user_data.academic_info.get('sat_total', ''),
-            'sat_math': user_data.academic_info.get('sat_math', ''),
-            'sat_reading': user_data.academic_info.get('sat_reading', ''),
-            'act_composite': user_data.academic_info.get('act_composite', ''),
-            'act_english': user_data.academic_info.get('act_english', ''),
-            'act_math': user_data.academic_info.get('act_math', ''),
-            'act_reading': user_data.academic_info.get('act_reading', ''),
-            'act_science': user_data.academic_info.get('act_science', ''),
-        })
-        
-        # Contact Information
-        mapping.update({
-            'address': user_data.contact_info.get('street', ''),
-            'street': user_data.contact_info.get('street', ''),
-            'city': user_data.contact_info.get('city', ''),
-            'state': user_data.contact_info.get('state', ''),
-            'zip': user_data.contact_info.get('zip_code', ''),
-            'zip_code': user_data.contact_info.get('zip_code', ''),
-            'country': user_data.contact_info.get('country', ''),
-        })
+    def _group_by_frame(self, fields: Dict[str, Any]) -> List[tuple]:
+        """(frame path, [(field name, field info), ...]) in frame-tree order"""
+        groups = {}
+        for field_name, field_info in fields.items():
+            groups.setdefault(tuple(field_info.get('frame', [])), []).append((field_name, field_info))
+        return [(list(frame), groups[frame]) for frame in sorted(groups)]
+
+    def fast_fill_fields(self, fields: Dict[str, Any], data_mapping: Dict[str, Any],
+                         profile: CompiledProfile = None) -> Dict[str, Dict[str, Any]]:
+        """Assign all values in one execute_script batch and report per-field success.
+
+        With the user's compiled profile, each field gets its value in the
+        format its input type needs (e.g. ISO dates for date inputs).
+        """
+        report = {}
+        for frame, frame_fields in self._group_by_frame(fields):
+            names = []
+            batch = []
+            for field_name, field_info in frame_fields:
+                if profile is not None:
+                    value = profile.value_for(field_name, field_info['type'])
+                else:
+                    value = data_mapping.get(field_name)
+                if not value:
+                    continue
+                if isinstance(value, list):
+                    value = ', '.join(str(item) for item in value)
+                names.append(field_name)
+                item = {
+                    'element': field_info['element'],
+                    'type': field_info['type'],
+                    'value': str(value)
+                }
+                if field_info['type'] == 'select' and profile is not None:
+                    item['candidates'] = profile.options_for(field_name)
+                batch.append(item)
+            if not batch:
+                continue
+            
+            # One script call per frame
+            try:
+                self._enter_frame(frame)
+                results = self.driver.execute_script(FAST_FILL_SCRIPT, batch, MIN_OPTION_SCORE)
+            except Exception as e:
+                print(f"Fast fill failed: {e}")
+                results = [{'ok': False, 'error': str(e)}] * len(batch)
+            
+            for field_name, item, result in zip(names, batch, results):
+                report[field_name] = {
+                    'success': bool(result.get('ok')),
+                    'value': result.get('value'),
+                    'error': result.get('error')
+                }
+                if 'score' in result:
+                    # Which option a select got, and how closely it matched
+                    report[field_name].update(score=result['score'], match=result.get('method'))
+                # File inputs can only be set through send_keys
+                if item['type'] == 'file' and os.path.exists(item['value']):
+                    try:
+                        item['element'].send_keys(item['value'])
+                        report[field_name] = {'success': True, 'value': item['value'], 'error': None}
+                    except Exception as e:
+                        report[field_name]['error'] = str(e)
         
-        return mapping
+        if self._current_frame:
+            self._enter_frame([])
+        self.last_fill_report = report
+        return report
+
+    def _create_data_mapping(self, user_data: UserData) -> Dict[str, Any]:
+        """Create mapping between form fields and user data"""
+        return user_data.compile().values
 
     def _find_and_click_submit(self) -> bool:
         """Find and click submit button (use with caution)"""
@@ -392,18 +782,20 @@ class AIFormFiller:
         """Context manager exit"""
         self.close()
 
-    def fill_form_field(self, field_info: Dict, value: str) -> bool:
-        """Fill a specific form field with error handling"""
+    def fill_form_field(self, field_info: Dict, value: str, candidates: List[str] = None) -> bool:
+        """Fill a specific form field with error handling.
+
+        candidates are the value's other formats, tried against select options.
+        """
         try:
             element = field_info['element']
             field_type = field_info['type']
             
-            # Scroll element into view
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(0.5)  # Wait for scroll to complete
-            
-            # Wait for element to be interactable
-            self.wait.until(EC.element_to_be_clickable(element))
+            # Scroll element into view (instantly) and wait until it can be used
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+            if not wait_until_interactable(self.driver, element, self.config['selenium']['timeout']):
+                print(f"Field {field_info.get('selector', '')} never became interactable")
+                return False
             
             # Try to focus the element
             try:
@@ -411,34 +803,23 @@ class AIFormFiller:
             except:
                 self.driver.execute_script("arguments[0].focus();", element)
             
-            if field_type in ['text', 'email', 'tel', 'number']:
-                element.clear()
-                # Type slowly to mimic human behavior
-                for char in value:
-                    element.send_keys(char)
-                    time.sleep(0.1)
-                
-            elif field_type == 'textarea':
+            if field_type in ['text', 'email', 'tel', 'number', 'textarea']:
                 element.clear()
-                # Type slowly to mimic human behavior
-                for char in value:
-                    element.send_keys(char)
-                    time.sleep(0.05)
+                if self.pacing:
+                    # Type slowly to mimic human behavior, a little faster in long answers
+                    for char in value:
+                        element.send_keys(char)
+                        pause(self.pacing, 'typing_speed', factor=0.5 if field_type == 'textarea' else 1)
+                else:
+                    element.send_keys(value)
                 
             elif field_type == 'select':
-                select = Select(element)
-                # Try to select by visible text first, then by value
-                try:
-                    select.select_by_visible_text(value)
-                except:
-                    try:
-                        select.select_by_value(value)
-                    except:
-                        # Try partial match
-                        for option in select.options:
-                            if value.lower() in option.text.lower():
-                                select.select_by_visible_text(option.text)
-                                break
+                # Rank all options in the browser in one call
+                choice = select_best_option(self.driver, element, candidates or [value])
+                if not choice:
+                    print(f"No option matches '{value}'")
+                    return False
+                print(f"Selected '{choice['value']}' ({choice['method']}, score {choice['score']})")
                                 
             elif field_type == 'file':
                 if value and os.path.exists(value):
@@ -448,10 +829,9 @@ class AIFormFiller:
                 if not element.is_selected():
                     element.click()
             
-            # Verify the field was filled
-            time.sleep(self.delays['field_fill'])
+            pause(self.pacing, 'field_fill')
             
-            # Additional verification for text fields
+            # Verify text fields actually took the value
             if field_type in ['text', 'email', 'tel', 'number', 'textarea']:
                 actual_value = element.get_attribute('value')
                 if not actual_value and value:
@@ -462,6 +842,9 @@ class AIFormFiller:
             
             return True
             
+        except (InvalidSessionIdException, NoSuchWindowException, ConnectionError):
+            # The browser is gone; no later field can succeed either
+            raise
         except Exception as e:
             print(f"Error filling field: {e}")
             return False 
\ No newline at end of file
@@ -0,0 +1,307 @@
+# batch_runner.py
+"""Fill many (profile, form URL) jobs in parallel, one browser per worker process.
+
+    python batch_runner.py manifest.json --workers 4 --report report.json
+
+The manifest is JSON:
+
+    {
+      "profiles": {"jordan": {"firstName": "Jordan", "email": "...", ...}},
+      "jobs": [
+        {"id": "jordan-nmsc", "user": "jordan", "url": "https://example.org/apply"},
+        {"user": "sam", "profile": {...}, "url": "https://example.org/other"}
+      ]
+    }
+
+Profiles use the same shape as the frontend (see UserData.from_profile) and
+may be given per job instead of under "profiles".
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from selenium.common.exceptions import WebDriverException
+
+from browser_pool import BrowserPool, PoolTimeout
+
+# Errors worth another attempt on a fresh browser; anything else fails the job
+TRANSIENT_ERRORS = (WebDriverException, PoolTimeout, BrokenProcessPool, TimeoutError,
+                    ConnectionError)
+
+# Browser pool and config file of each worker process, set by _init_worker
+_worker = {}
+
+
+def _init_worker(config_file: str, max_uses: int):
+    """Launch the browser this worker process fills every job with"""
+    from autofill import AIFormFiller
+
+    load_dotenv()
+
+    def launch():
+        return AIFormFiller(config_file).create_driver()
+
+    pool = BrowserPool(factory=launch, max_size=1, min_idle=1, max_uses=max_uses)
+    pool.start()
+    _worker.update(pool=pool, config_file=config_file)
+
+
+def _run_job(job: Dict[str, Any], fast_fill: Optional[bool]) -> Dict[str, Any]:
+    """Fill one form in this worker; returns the outcome and its timings"""
+    from autofill import AIFormFiller, UserData
+
+    started = time.time()
+    filler = AIFormFiller(_worker['config_file'], openai_api_key=os.getenv('OPENAI_API_KEY'))
+    result = {'pid': os.getpid(), 'startedAt': started}
+    try:
+        with _worker['pool'].session() as driver:
+            filler.attach_driver(driver)
+            try:
+                result['success'] = filler.fill_form(job['url'], UserData.from_profile(job['profile']),
+                                                     fast_fill=fast_fill)
+            finally:
+                filler.detach_driver()
+    except TRANSIENT_ERRORS as e:
+        result.update(success=False, error=f"{type(e).__name__}: {str(e).strip()}", transient=True)
+    except Exception as e:
+        result.update(success=False, error=f"{type(e).__name__}: {str(e).strip()}", transient=False)
+
+    result['duration'] = round(time.time() - started, 3)
+    result['pageWaits'] = filler.page_timings
+    if filler.last_fill_report:
+        result['fields'] = filler.last_fill_report
+    return result
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """Jobs from a manifest file, each with its id, user, url and profile"""
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+
+    profiles = manifest.get('profiles', {})
+    jobs = []
+    for index, entry in enumerate(manifest.get('jobs', [])):
+        user = entry.get('user') or entry.get('profile', {}).get('email') or f"user-{index}"
+        profile = entry.get('profile') or profiles.get(user)
+        if profile is None:
+            raise ValueError(f"Job {index} references unknown profile '{user}'")
+        if not entry.get('url'):
+            raise ValueError(f"Job {index} has no url")
+        jobs.append({
+            'id': str(entry.get('id', index)),
+            'user': user,
+            'url': entry['url'],
+            'profile': profile
+        })
+    return jobs
+
+
+class BatchRunner:
+    """Runs fill jobs on worker processes, rotating fairly between users.
+
+    Each user has a queue; free workers take the next job round-robin from
+    users with fewer than per_user jobs in flight, so one user's long list
+    never starves the others. Transient failures are retried with exponential
+    backoff, up to max_attempts per job.
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], workers: int = None, per_user: int = 1,
+                 max_attempts: int = 3, retry_delay: float = 5, config_file: str = 'ai.json',
+                 fast_fill: Optional[bool] = None, max_uses: int = 25):
+        self.jobs = jobs
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.per_user = max(1, per_user)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.config_file = config_file
+        self.fast_fill = fast_fill
+        self.max_uses = max_uses
+
+        self._queues = {}
+        for job in jobs:
+            job.update(attempts=0, not_before=0.0, queued_at=None, errors=[])
+            self._queues.setdefault(job['user'], deque()).append(job)
+        self._users = deque(self._queues)
+        self._active = {user: 0 for user in self._queues}
+        self._results = {}
+        self._executor = None
+
+    def _start_executor(self):
+        # Spawn so each worker starts clean and owns exactly one browser
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.config_file, self.max_uses)
+        )
+
+    def _next_job(self, now: float) -> Optional[Dict[str, Any]]:
+        """Next runnable job, rotating through users"""
+        for _ in range(len(self._users)):
+            user = self._users[0]
+            self._users.rotate(-1)
+            queue = self._queues[user]
+            if queue and self._active[user] < self.per_user and queue[0]['not_before'] <= now:
+                return queue.popleft()
+        return None
+
+    def _pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _finish(self, job: Dict[str, Any], outcome: Dict[str, Any]):
+        status = 'succeeded' if outcome.get('success') else 'failed'
+        if outcome.get('error'):
+            status = 'error'
+        self._results[job['id']] = {
+            'id': job['id'],
+            'user': job['user'],
+            'url': job['url'],
+            'status': status,
+            'attempts': job['attempts'],
+            'errors': job['errors'],
+            'queueSeconds': round(outcome.get('startedAt', time.time()) - job['queued_at'], 3),
+            **{key: value for key, value in outcome.items() if key not in ('success', 'transient')}
+        }
+        print(f"[{len(self._results)}/{len(self.jobs)}] {job['id']} ({job['user']}): {status}")
+
+    def _handle(self, job: Dict[str, Any], outcome: Dict[str, Any]):
+        self._active[job['user']] -= 1
+        if outcome.get('transient') and job['attempts'] < self.max_attempts:
+            job['errors'].append(outcome['error'])
+            # Exponential backoff with jitter, keeping the job at the front of its user's queue
+            delay = self.retry_delay * 2 ** (job['attempts'] - 1)
+            job['not_before'] = time.time() + delay * random.uniform(0.8, 1.2)
+            self._queues[job['user']].appendleft(job)
+            print(f"{job['id']}: {outcome['error']}, retrying in {delay:.1f}s")
+            return
+        self._finish(job, outcome)
+
+    def run(self) -> Dict[str, Any]:
+        """Run every job and return the report"""
+        started = time.time()
+        for job in self.jobs:
+            job['queued_at'] = started
+        in_flight = {}
+        self._start_executor()
+        try:
+            while in_flight or self._pending():
+                now = time.time()
+                while len(in_flight) < self.workers:
+                    job = self._next_job(now)
+                    if job is None:
+                        break
+                    job['attempts'] += 1
+                    self._active[job['user']] += 1
+                    in_flight[self._executor.submit(_run_job, job, self.fast_fill)] = job
+
+                if not in_flight:
+                    # Everything left is backing off
+                    waiting = min(queue[0]['not_before'] for queue in self._queues.values() if queue)
+                    time.sleep(max(0.05, waiting - now))
+                    continue
+
+                done, _ = wait(in_flight, timeout=1, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        outcome = future.result()
+                    except BrokenProcessPool as e:
+                        # A worker died (e.g. its browser took it down); the pool must be rebuilt
+                        broken = True
+                        outcome = {'success': False, 'error': f"Worker process died: {e}", 'transient': True}
+                    except Exception as e:
+                        outcome = {'success': False, 'error': f"{type(e).__name__}: {e}", 'transient': False}
+                    self._handle(job, outcome)
+
+                if broken:
+                    for future, job in list(in_flight.items()):
+                        in_flight.pop(future)
+                        self._handle(job, {'success': False, 'error': 'Worker pool restarted',
+                                           'transient': True})
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._start_executor()
+        except KeyboardInterrupt:
+            print("Interrupted, writing partial report")
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+        return self.report(time.time() - started)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        results = [self._results.get(job['id']) or {
+            'id': job['id'], 'user': job['user'], 'url': job['url'], 'status': 'not_run',
+            'attempts': job['attempts'], 'errors': job['errors']
+        } for job in self.jobs]
+
+        by_status = {}
+        by_user = {}
+        for result in results:
+            by_status[result['status']] = by_status.get(result['status'], 0) + 1
+            counts = by_user.setdefault(result['user'], {})
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+
+        durations = [result['duration'] for result in results if 'duration' in result]
+        return {
+            'summary': {
+                'jobs': len(results),
+                'workers': self.workers,
+                'elapsedSeconds': round(elapsed, 3),
+                'jobsPerMinute': round(len(durations) / elapsed * 60, 2) if elapsed else 0,
+                'meanJobSeconds': round(sum(durations) / len(durations), 3) if durations else None,
+                'byStatus': by_status,
+                'byUser': by_user
+            },
+            'jobs': results
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('manifest', help='JSON manifest of profiles and jobs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes, each with one browser (default: CPU count)')
+    parser.add_argument('--per-user', type=int, default=1,
+                        help='Jobs of the same user allowed to run at once (default: 1)')
+    parser.add_argument('--attempts', type=int, default=3,
+                        help='Attempts per job for transient failures (default: 3)')
+    parser.add_argument('--retry-delay', type=float, default=5,
+                        help='Seconds before the first retry, doubling after each (default: 5)')
+    parser.add_argument('--config', default='ai.json', help='Filler config file')
+    parser.add_argument('--fast-fill', action='store_true', default=None,
+                        help='Assign all values in one script call instead of typing')
+    parser.add_argument('--report', default='batch_report.json', help='Where to write the report')
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest)
+    runner = BatchRunner(
+        jobs,
+        workers=args.workers,
+        per_user=args.per_user,
+        max_attempts=args.attempts,
+        retry_delay=args.retry_delay,
+        config_file=args.config,
+        fast_fill=args.fast_fill,
+        max_uses=int(os.getenv('BROWSER_POOL_MAX_USES', 25))
+    )
+    report = runner.run()
+
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    summary = report['summary']
+    print(f"{summary['byStatus']} in {summary['elapsedSeconds']}s "
+          f"({summary['jobsPerMinute']} jobs/min) - report written to {args.report}")
+    return 0 if summary['byStatus'].get('succeeded', 0) == summary['jobs'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
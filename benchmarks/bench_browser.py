@@ -0,0 +1,75 @@
+# benchmarks/bench_browser.py
+"""Compare page load time and browser memory with and without lean mode.
+
+Loads each URL in a headless Chrome in the standard profile and in lean mode
+(blocked images/fonts/media and tracker domains, eager page load) and prints
+JSON with per-URL timings and the resident memory of the browser processes.
+Needs Chrome and chromedriver, and network access to the pages.
+
+    python benchmarks/bench_browser.py https://example.org/apply --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_autofill_service import AIFormFiller
+from browser_profile import browser_memory, lean_settings, page_load_stats
+
+
+def bench_mode(lean: bool, urls: List[str], repeat: int) -> Dict[str, Any]:
+    filler = AIFormFiller()
+    filler.browser_settings = dict(filler.browser_settings, headless=True)
+    filler.lean = lean_settings(lean)
+    driver = filler.create_driver()
+    try:
+        pages = {}
+        for url in urls:
+            get_seconds = []
+            dom_ready_ms = []
+            transfer_bytes = []
+            for _ in range(repeat):
+                driver.get('about:blank')
+                started = time.perf_counter()
+                driver.get(url)
+                get_seconds.append(time.perf_counter() - started)
+                stats = page_load_stats(driver) or {}
+                dom_ready_ms.append(stats.get('domContentLoadedMs', 0))
+                transfer_bytes.append(stats.get('transferBytes', 0))
+            pages[url] = {
+                'getSecondsMedian': round(statistics.median(get_seconds), 3),
+                'domContentLoadedMsMedian': statistics.median(dom_ready_ms),
+                'transferBytesMedian': statistics.median(transfer_bytes)
+            }
+        return {'pages': pages, 'memory': browser_memory(driver)}
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('urls', nargs='+', help='Form pages to load')
+    parser.add_argument('--repeat', type=int, default=3, help='Loads per URL and mode')
+    args = parser.parse_args()
+
+    try:
+        results = {
+            'standard': bench_mode(False, args.urls, args.repeat),
+            'lean': bench_mode(True, args.urls, args.repeat)
+        }
+    except Exception as e:
+        print(f"Could not run browser benchmark: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
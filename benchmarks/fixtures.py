@@ -0,0 +1,138 @@
+# benchmarks/fixtures.py
+import random
+from typing import Any, Dict, List
+
+# Field names drawn from the configured patterns so matching has real work to do
+FIELD_NAMES = [
+    'first_name', 'lastName', 'email_address', 'phone_number', 'dob', 'street_address',
+    'city', 'state', 'zip_code', 'gpa', 'major', 'school_name', 'grad_year',
+    'personal_statement', 'applicant_name', 'mobile', 'postal_code', 'university',
+]
+LABELS = [
+    'First Name', 'Last Name', 'Email', 'Phone', 'Date of Birth', 'Street Address',
+    'City', 'State', 'ZIP Code', 'Cumulative GPA', 'Intended Major', 'High School',
+    'Expected Graduation', 'Why do you deserve this scholarship?', 'Full Name',
+    'Mobile', 'Postal Code', 'University',
+]
+
+# Fields per fieldset and options per select
+SECTION_SIZE = 25
+SELECT_OPTIONS = 250
+
+
+def generate_fields(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Deterministic field specs mixing labelled inputs, selects, textareas and hidden inputs"""
+    rng = random.Random(seed)
+    fields = []
+    for i in range(count):
+        base = rng.randrange(len(FIELD_NAMES))
+        kind = i % 10
+        spec = {
+            'index': i,
+            'name': f"{FIELD_NAMES[base]}_{i}",
+            'id': f"f{i}" if i % 3 else '',
+            'label': LABELS[base],
+            'placeholder': LABELS[base].lower() if i % 4 == 0 else '',
+            'required': i % 5 == 0,
+            'section': i // SECTION_SIZE,
+        }
+        if kind == 0:
+            spec.update(tag='select', type='select', options=[
+                (f"opt{j}", f"Option {j}") for j in range(SELECT_OPTIONS)
+            ])
+        elif kind == 1:
+            spec.update(tag='textarea', type='textarea')
+        elif kind == 2:
+            spec.update(tag='input', type='hidden', label='')
+        else:
+            spec.update(tag='input', type=['text', 'email', 'tel', 'date'][i % 4])
+        fields.append(spec)
+    return fields
+
+
+def _render_field(spec: Dict[str, Any]) -> str:
+    attrs = f'name="{spec["name"]}"'
+    if spec['id']:
+        attrs += f' id="{spec["id"]}"'
+    if spec['placeholder']:
+        attrs += f' placeholder="{spec["placeholder"]}"'
+    if spec['required']:
+        attrs += ' required'
+
+    if spec['tag'] == 'select':
+        options = ''.join(f'<option value="{value}">{text}</option>' for value, text in spec['options'])
+        control = f'<select {attrs}>{options}</select>'
+    elif spec['tag'] == 'textarea':
+        control = f'<textarea {attrs}></textarea>'
+    else:
+        control = f'<input type="{spec["type"]}" {attrs}>'
+
+    if spec['type'] == 'hidden':
+        return control
+    if spec['id']:
+        return f'<div class="row"><label for="{spec["id"]}">{spec["label"]}</label>{control}</div>'
+    # Field without an id: wrap it in its label
+    return f'<div class="row"><label>{spec["label"]} {control}</label></div>'
+
+
+def render_html(fields: List[Dict[str, Any]]) -> str:
+    """Render field specs as an application page with nested fieldsets"""
+    sections = {}
+    for spec in fields:
+        sections.setdefault(spec['section'], []).append(_render_field(spec))
+
+    body = []
+    for number, rows in sections.items():
+        half = len(rows) // 2
+        body.append(
+            f'<fieldset id="section{number}"><legend>Section {number}</legend>'
+            + ''.join(rows[:half])
+            + f'<fieldset><legend>Section {number} details</legend>'
+            + ''.join(rows[half:])
+            + '</fieldset></fieldset>'
+        )
+    return (
+        '<html><head><title>Scholarship Application</title></head><body>'
+        '<form id="application" action="/apply">' + ''.join(body) +
+        '<input type="submit" value="Apply"></form></body></html>'
+    )
+
+
+def snapshot(fields: List[Dict[str, Any]], element_factory) -> List[Dict[str, Any]]:
+    """What the in-browser field snapshot script would return for these fields"""
+    return [
+        {
+            'element': element_factory(spec),
+            'tag': spec['tag'],
+            'type': spec['type'] if spec['tag'] == 'input' else spec['tag'],
+            'name': spec['name'],
+            'id': spec['id'],
+            'placeholder': spec['placeholder'],
+            'label': spec['label'],
+            'selector': f"#{spec['id']}" if spec['id'] else f"{spec['tag']}[name=\"{spec['name']}\"]",
+        }
+        for spec in fields
+    ]
+
+
+def sample_profile() -> Dict[str, Any]:
+    """Profile in the shape the frontend sends, as read by UserData.from_profile"""
+    return {
+        'firstName': 'Jordan',
+        'lastName': 'Rivera',
+        'email': 'jordan.rivera@example.com',
+        'phone': '8035551234',
+        'dateOfBirth': '2006-04-12',
+        'school': 'Columbia High School',
+        'schoolYear': 'Senior',
+        'major': 'Computer Science',
+        'gpa': 3.87,
+        'graduationYear': 2025,
+        'testScores': {'sat': {'total': 1450, 'math': 760, 'reading': 690}},
+        'address': {
+            'street': '12 Main St',
+            'city': 'Columbia',
+            'state': 'SC',
+            'zipCode': '29201',
+        },
+    }
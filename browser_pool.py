@@ -0,0 +1,216 @@
+# browser_pool.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolTimeout(Exception):
+    """Raised when no browser session becomes available in time"""
+
+
+class _Session:
+    """A pooled browser and its bookkeeping"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class BrowserPool:
+    """Bounded pool of pre-launched WebDriver sessions.
+
+    At most max_size browsers exist at once; callers beyond that queue until a
+    session is checked back in. Sessions are reset between users, health
+    checked on checkout and recycled after max_uses or when they fail.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_size: int = 4, min_idle: int = 1,
+                 max_uses: int = 25, checkout_timeout: float = 120):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.min_idle = min(max(0, min_idle), self.max_size)
+        self.max_uses = max_uses
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._started = False
+        self._closed = False
+
+    def start(self):
+        """Begin warming browsers in the background"""
+        with self._cond:
+            if self._started or self._closed:
+                return
+            self._started = True
+        self._replenish()
+
+    def checkout(self, timeout: Optional[float] = None):
+        """Take a healthy browser from the pool, waiting for one if all are busy"""
+        self.start()
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            session = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Browser pool is closed")
+                    if self._idle:
+                        session = self._idle.popleft()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No browser available within {timeout}s")
+                    self._cond.wait(remaining)
+
+            if session is None:
+                session = self._launch()
+            elif not self._is_healthy(session.driver):
+                print("Discarding unhealthy pooled browser")
+                self._discard(session)
+                continue
+
+            with self._cond:
+                self._in_use[id(session.driver)] = session
+            self._replenish()
+            return session.driver
+
+    def checkin(self, driver, failed: bool = False):
+        """Return a browser to the pool, recycling it if it failed or is worn out"""
+        with self._cond:
+            session = self._in_use.pop(id(driver), None)
+        if session is None:
+            return
+
+        session.uses += 1
+        recycle = failed or self._closed or session.uses >= self.max_uses
+        if not recycle:
+            try:
+                self._reset(driver)
+            except Exception as e:
+                print(f"Error resetting pooled browser: {e}")
+                recycle = True
+
+        if recycle:
+            self._discard(session)
+            self._replenish()
+        else:
+            with self._cond:
+                self._idle.append(session)
+                self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """Check out a browser for the duration of a with block"""
+        driver = self.checkout(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.checkin(driver, failed=failed)
+
+    def stats(self) -> Dict[str, int]:
+        """Current pool occupancy"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'max_size': self.max_size
+            }
+
+    def close(self):
+        """Quit idle browsers; busy ones are quit when checked in"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for session in idle:
+            self._discard(session)
+
+    def _launch(self) -> _Session:
+        try:
+            return _Session(self.factory())
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _discard(self, session: _Session):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            print(f"Error quitting pooled browser: {e}")
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _replenish(self):
+        """Launch browsers in the background until min_idle are waiting"""
+        with self._cond:
+            if self._closed:
+                return
+            missing = min(self.min_idle - len(self._idle), self.max_size - self._size)
+            if missing <= 0:
+                return
+            self._size += missing
+
+        def warm():
+            for _ in range(missing):
+                try:
+                    session = self._launch()
+                except Exception as e:
+                    print(f"Error warming browser: {e}")
+                    continue
+                with self._cond:
+                    if self._closed:
+                        closed = True
+                    else:
+                        closed = False
+                        self._idle.append(session)
+                        self._cond.notify()
+                if closed:
+                    self._discard(session)
+
+        threading.Thread(target=warm, daemon=True).start()
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        """Clear cookies and storage of every origin so the next user starts clean.
+
+        Without CDP only the current page's storage could be cleared, so such a
+        browser is recycled instead.
+        """
+        if not hasattr(driver, 'execute_cdp_cmd'):
+            raise RuntimeError("browser has no CDP access to clear storage of every origin")
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        # Local and session storage, IndexedDB, cache storage and service workers
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': '*', 'storageTypes': 'all'})
+
+        # Close any extra windows the previous user opened
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get('about:blank')
@@ -0,0 +1,181 @@
+# browser_profile.py
+import os
+from typing import Any, Dict, List, Optional
+
+# Resource types a form fill never needs, and the URL patterns that block them
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.ogg', '*.mp3', '*.m4a', '*.wav', '*.mov', '*.avi', '*.m3u8'],
+    'stylesheet': ['*.css'],
+}
+
+# Analytics, ads, chat widgets and video embeds common on scholarship sites
+DEFAULT_BLOCKED_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'googlesyndication.com', 'adservice.google.com', 'facebook.net', 'connect.facebook.net',
+    'hotjar.com', 'segment.io', 'segment.com', 'mixpanel.com', 'fullstory.com',
+    'newrelic.com', 'nr-data.net', 'clarity.ms', 'bing.com', 'linkedin.com',
+    'ads-twitter.com', 'tiktok.com', 'intercom.io', 'intercomcdn.com', 'zendesk.com',
+    'drift.com', 'youtube.com', 'vimeo.com', 'fonts.googleapis.com', 'fonts.gstatic.com',
+]
+
+# Stylesheets stay on by default: visibility and clickability checks depend on them
+LEAN_DEFAULTS = {
+    'enabled': True,
+    'block_resource_types': ['image', 'font', 'media'],
+    'block_domains': DEFAULT_BLOCKED_DOMAINS,
+    'page_load_strategy': 'eager',
+}
+
+# Chrome switches that skip background work a short-lived fill session never uses
+LEAN_ARGUMENTS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-dev-shm-usage',
+    '--mute-audio',
+    '--no-first-run',
+]
+
+# Navigation Timing for the current page, in milliseconds from navigation start
+PAGE_LOAD_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+if (!nav) return null;
+return {
+    domContentLoadedMs: Math.round(nav.domContentLoadedEventEnd),
+    loadMs: Math.round(nav.loadEventEnd),
+    responseMs: Math.round(nav.responseEnd),
+    transferBytes: nav.transferSize + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+    resources: resources.length
+};
+"""
+
+
+def lean_settings(settings: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Lean mode settings with defaults filled in; settings may be a bool"""
+    if isinstance(settings, bool):
+        settings = {'enabled': settings}
+    merged = dict(LEAN_DEFAULTS)
+    merged.update(settings or {})
+    return merged
+
+
+def apply_lean_options(options, settings: Dict[str, Any]):
+    """Add lean mode switches and page load strategy to Chrome options"""
+    if not settings.get('enabled'):
+        return options
+    for argument in LEAN_ARGUMENTS:
+        options.add_argument(argument)
+    if 'image' in settings.get('block_resource_types', []):
+        # Images are also refused by URL pattern; this catches extensionless ones
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2
+        })
+    options.page_load_strategy = settings.get('page_load_strategy', 'eager')
+    return options
+
+
+def blocked_url_patterns(settings: Dict[str, Any]) -> List[str]:
+    """URL patterns for Network.setBlockedURLs"""
+    patterns = []
+    for resource_type in settings.get('block_resource_types', []):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+    for domain in settings.get('block_domains', []):
+        patterns.extend([f"*://{domain}/*", f"*://*.{domain}/*"])
+    return patterns
+
+
+def enable_request_blocking(driver, settings: Dict[str, Any]) -> bool:
+    """Block the configured resource types and domains in a running Chrome"""
+    if not settings.get('enabled') or not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    patterns = blocked_url_patterns(settings)
+    if not patterns:
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return True
+    except Exception as e:
+        print(f"Could not enable request blocking: {e}")
+        return False
+
+
+def page_load_stats(driver) -> Optional[Dict[str, Any]]:
+    """Navigation timing and bytes transferred for the page currently loaded"""
+    try:
+        return driver.execute_script(PAGE_LOAD_SCRIPT)
+    except Exception as e:
+        print(f"Could not read page load timing: {e}")
+        return None
+
+
+def _child_pids() -> Dict[int, List[int]]:
+    """Parent pid -> child pids, from /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                # The command name may contain spaces; ppid follows its closing paren
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status", 'r') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def browser_memory(driver) -> Optional[Dict[str, Any]]:
+    """Resident memory of every browser process under the driver's chromedriver.
+
+    Uses psutil when installed, otherwise /proc (Linux only). Returns None when
+    neither is available.
+    """
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None)
+    if process is None:
+        return None
+
+    per_process = []
+    try:
+        import psutil
+        for child in psutil.Process(process.pid).children(recursive=True):
+            try:
+                per_process.append(child.memory_info().rss)
+            except psutil.Error:
+                pass
+    except ImportError:
+        if not os.path.isdir('/proc'):
+            return None
+        children = _child_pids()
+        pending = list(children.get(process.pid, []))
+        while pending:
+            pid = pending.pop()
+            pending.extend(children.get(pid, []))
+            try:
+                per_process.append(_rss_bytes(pid))
+            except OSError:
+                pass
+    except Exception as e:
+        print(f"Could not measure browser memory: {e}")
+        return None
+
+    return {
+        'processes': len(per_process),
+        'rssBytes': sum(per_process),
+        'maxProcessRssBytes': max(per_process, default=0)
+    }
@@ -0,0 +1,131 @@
+# config_registry.py
+import json
+import os
+import signal
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from field_matcher import get_pattern_index
+
+
+class ConfigSnapshot:
+    """One loaded version of a config file plus the structures derived from it.
+
+    Snapshots are shared between requests and must be treated as read-only;
+    a reload builds a new snapshot instead of changing an existing one.
+    """
+
+    def __init__(self, path: str, data: Dict[str, Any], mtime: Optional[float], generation: int = 0):
+        self.path = path
+        self.data = data
+        self.mtime = mtime
+        self.generation = generation
+        self.loaded_at = time.time()
+
+        # ai.json nests its settings under "config"; config/autofill.json does not
+        self.settings = data.get('config', data)
+        self.field_patterns = (
+            self.settings.get('field_patterns') or self.settings.get('form_fields') or {}
+        )
+        self.pattern_index = get_pattern_index(self.field_patterns)
+        self.selectors = self.settings.get('selectors', {})
+        self.delays = self._delay_table()
+        # Fixed delays apply only when human-like pacing is switched on;
+        # otherwise the fill path waits for readiness conditions alone
+        human_pacing = (
+            self.settings.get('human_pacing') or
+            self.settings.get('form_filling', {}).get('human_pacing', False)
+        )
+        self.pacing = self.delays if human_pacing else {}
+
+    def _delay_table(self) -> Dict[str, float]:
+        """Delays in seconds, whichever layout and unit the file uses"""
+        if 'delays' in self.settings:
+            # ai.json gives seconds
+            return {key: float(value) for key, value in self.settings['delays'].items()}
+        delays = self.settings.get('form_filling', {}).get('delays', {})
+        return {key: value / 1000 for key, value in delays.items()}
+
+
+class ConfigRegistry:
+    """Process-wide cache of parsed config files.
+
+    Files are parsed once and re-read only when their mtime changes (checked
+    at most every check_interval seconds) or after SIGHUP. Reloads swap in a
+    new snapshot atomically, so in-flight requests keep the one they started with.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._snapshots = {}
+        self._checked_at = {}
+        # Bumped by reload(); snapshots from an older generation are re-read
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str, required: bool = True) -> ConfigSnapshot:
+        """Current snapshot of a config file, reloading it if it changed.
+
+        A missing or unreadable file raises when required; otherwise an empty
+        config is used. A broken edit keeps serving the last good snapshot.
+        """
+        generation = self._generation
+        snapshot = self._snapshots.get(path)
+        now = time.monotonic()
+        fresh = snapshot is not None and snapshot.generation == generation
+        if fresh and now - self._checked_at.get(path, 0) < self.check_interval:
+            return snapshot
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        self._checked_at[path] = now
+
+        if fresh and mtime == snapshot.mtime:
+            return snapshot
+
+        with self._lock:
+            current = self._snapshots.get(path)
+            if (current is not None and current is not snapshot and
+                    current.generation == generation and current.mtime == mtime):
+                # Another thread reloaded while we waited for the lock
+                return current
+            return self._load(path, mtime, generation, current, required)
+
+    def _load(self, path: str, mtime: Optional[float], generation: int,
+              current: Optional[ConfigSnapshot], required: bool) -> ConfigSnapshot:
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            snapshot = ConfigSnapshot(path, data, mtime, generation)
+        except Exception as e:
+            if current:
+                print(f"Error reloading config {path}, keeping previous version: {e}")
+                return current
+            if required:
+                raise
+            print(f"Error loading config: {e}")
+            snapshot = ConfigSnapshot(path, {}, mtime, generation)
+
+        self._snapshots[path] = snapshot
+        return snapshot
+
+    def reload(self):
+        """Re-read every config file on its next use"""
+        self._generation += 1
+
+    def install_signal_handler(self):
+        """Reload configs on SIGHUP; only possible from the main thread"""
+        if not hasattr(signal, 'SIGHUP'):
+            return
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload())
+        except ValueError:
+            # signal.signal only works in the main thread
+            pass
+
+
+# Shared by every module in the process
+config_registry = ConfigRegistry()
@@ -0,0 +1,186 @@
+# field_matcher.py
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Characters that mark a pattern as a regular expression rather than a literal name
+REGEX_CHARS = re.compile(r'[.*+?()\[\]|\\^$]')
+
+# Attributes consulted when resolving a field, with the score an exact or
+# partial match on each earns. Names and ids beat free text.
+ATTRIBUTE_SCORES = [
+    ('name', 4, 3),
+    ('id', 4, 3),
+    ('label', 2, 1),
+    ('placeholder', 2, 1),
+]
+
+# Words that make a field about someone or something other than the applicant's
+# current details ("emergency_contact_name", "previous_college_gpa"); a partial
+# match next to one of them is not trusted
+QUALIFIER_WORDS = {
+    'emergency', 'parent', 'guardian', 'mother', 'father', 'spouse', 'sibling',
+    'reference', 'recommender', 'referee', 'previous', 'prior', 'former',
+}
+
+# Words that make a field belong to an organization ("company_name",
+# "school_phone"); a partial match next to one of them is not trusted for the
+# applicant's own personal or contact details, though "school_gpa" is fine
+ORGANIZATION_WORDS = {
+    'company', 'employer', 'business', 'organization', 'org', 'school', 'college',
+    'university', 'institution', 'club', 'team', 'church', 'agency',
+}
+APPLICANT_CATEGORIES = {'personal', 'contact'}
+
+# Trailing words that don't change what a field holds ("email_address_required")
+TRAILING_NOISE_WORDS = {'required', 'optional', 'only', 'please', 'line'}
+
+
+def normalize_token(text: str) -> str:
+    """Lowercase text, split camelCase and collapse separators to underscores"""
+    text = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', text or '')
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+class FieldPatternIndex:
+    """Compiled matcher resolving form fields to canonical field_patterns keys.
+
+    Literal patterns are looked up in a dict; everything else is folded into
+    one alternation regex, so resolving a field costs one lookup and at most
+    one regex match per word of each attribute no matter how many patterns
+    are configured.
+    """
+
+    def __init__(self, field_patterns: Dict[str, Dict[str, List[str]]]):
+        self.categories = {}
+        self._exact = {}
+        self._group_keys = {}
+        # Most words any pattern can match, None when a regex can match any number
+        self._max_words = 0
+        alternatives = []
+
+        for category, fields in (field_patterns or {}).items():
+            for key, patterns in fields.items():
+                self.categories.setdefault(key, category)
+                for pattern in patterns:
+                    if REGEX_CHARS.search(pattern):
+                        regex = pattern.lower()
+                        specificity = len(re.sub(r'[^a-z0-9]', '', regex))
+                        self._max_words = None
+                    else:
+                        literal = normalize_token(pattern)
+                        if not literal:
+                            continue
+                        self._exact.setdefault(literal, key)
+                        self._exact.setdefault(literal.replace('_', ''), key)
+                        regex = '_?'.join(re.escape(part) for part in literal.split('_'))
+                        specificity = len(literal.replace('_', ''))
+                        if self._max_words is not None:
+                            self._max_words = max(self._max_words, literal.count('_') + 1)
+                    alternatives.append((specificity, regex, key))
+
+        # Longer patterns first so 'statement' wins over 'state' at the same position
+        alternatives.sort(key=lambda item: -item[0])
+        parts = []
+        for index, (_, regex, key) in enumerate(alternatives):
+            try:
+                re.compile(regex)
+            except re.error as e:
+                print(f"Skipping invalid field pattern {regex!r}: {e}")
+                continue
+            group = f"p{index}"
+            self._group_keys[group] = key
+            parts.append(f"(?P<{group}>{regex})")
+
+        # Every alternative must start and end on a word of the token, so 'city'
+        # never matches inside 'ethnicity'
+        self._regex = (
+            re.compile(f"(?<![a-z0-9])(?:{'|'.join(parts)})(?![a-z0-9])") if parts else None
+        )
+
+    def resolve_text(self, text: str) -> Tuple[Optional[str], bool]:
+        """Resolve one attribute value to (key, exact) or (None, False)"""
+        token = normalize_token(text)
+        if not token:
+            return None, False
+
+        key = self._exact.get(token) or self._exact.get(token.replace('_', ''))
+        if key:
+            return key, True
+
+        if self._regex:
+            return self._resolve_partial(token), False
+
+        return None, False
+
+    def _resolve_partial(self, token: str) -> Optional[str]:
+        """Key of the longest pattern matching whole words that end the token.
+
+        Field names put the word saying what they hold last ("home_phone",
+        "current_gpa"), so a match that stops before the last word
+        ("mobile_carrier") names a modifier, not the field.
+        """
+        words = token.split('_')
+        while len(words) > 1 and (words[-1].isdigit() or words[-1] in TRAILING_NOISE_WORDS):
+            words.pop()
+        head_end = len('_'.join(words))
+
+        # The earliest start that matches through to the head is the longest
+        # match; no match can start more words back than the longest pattern spans
+        first = 0 if self._max_words is None else max(len(words) - self._max_words, 0)
+        start = len('_'.join(words[:first])) + (1 if first else 0)
+        for word in words[first:]:
+            match = self._regex.fullmatch(token, start, head_end)
+            if match:
+                before = set(token[:start].split('_'))
+                key = self._group_keys[match.lastgroup]
+                if QUALIFIER_WORDS & before:
+                    return None
+                if ORGANIZATION_WORDS & before and self.categories.get(key) in APPLICANT_CATEGORIES:
+                    return None
+                return key
+            start += len(word) + 1
+        return None
+
+    def resolve(self, field: Dict[str, Any]) -> Tuple[Optional[str], int]:
+        """Resolve a field descriptor to its canonical key and a match score"""
+        best_key, best_score = None, 0
+        for attribute, exact_score, partial_score in ATTRIBUTE_SCORES:
+            key, exact = self.resolve_text(field.get(attribute) or '')
+            if not key:
+                continue
+            score = exact_score if exact else partial_score
+            if score > best_score:
+                best_key, best_score = key, score
+            if best_score == ATTRIBUTE_SCORES[0][1]:
+                break
+        return best_key, best_score
+
+    def resolve_all(self, fields: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Map each canonical key to the best matching field, first in document order on ties"""
+        matched = {}
+        scores = {}
+        for field in fields:
+            key, score = self.resolve(field)
+            if key and score > scores.get(key, 0):
+                matched[key] = field
+                scores[key] = score
+        return matched
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_pattern_index(field_patterns: Dict[str, Dict[str, List[str]]]) -> FieldPatternIndex:
+    """Return the shared compiled index for a field_patterns tree"""
+    digest = hashlib.sha256(
+        json.dumps(field_patterns or {}, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    with _indexes_lock:
+        index = _indexes.get(digest)
+        if index is None:
+            index = _indexes[digest] = FieldPatternIndex(field_patterns)
+        return index
@@ -0,0 +1,287 @@
+# form_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from profile_variants import compile_profile
+
+# Bump when the prompt or instruction format changes so stale mappings are not reused
+CACHE_VERSION = 3
+
+# Keys of an extracted field that describe the form structure (never user data)
+FINGERPRINT_KEYS = ('tag', 'type', 'name', 'id', 'label', 'placeholder', 'required', 'selector')
+
+
+def form_fingerprint(form_fields: List[Dict]) -> str:
+    """Hash the structure of a form as returned by _extract_form_fields"""
+    structure = []
+    for field in form_fields:
+        entry = [field.get(key, '') for key in FINGERPRINT_KEYS]
+        entry.append([
+            [opt.get('value', ''), opt.get('text', '')]
+            for opt in field.get('options', [])
+        ])
+        structure.append(entry)
+
+    payload = json.dumps([CACHE_VERSION, structure], separators=(',', ':'), sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def analysis_key(fingerprint: str, user_data: Dict) -> str:
+    """Cache key for analyses of a form for users holding the same data keys.
+
+    A cached analysis only has instructions for the fields its user had data
+    for, so users with other keys filled must not share it.
+    """
+    paths = sorted(path for path, value in flatten_user_data(user_data).items() if value)
+    payload = json.dumps([fingerprint, paths], separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def flatten_user_data(user_data: Dict, prefix: str = '') -> Dict[str, str]:
+    """Flatten nested user data into dotted paths with scalar string values"""
+    flat = {}
+    for key, value in (user_data or {}).items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_user_data(value, f"{path}."))
+        elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            flat[path] = str(value)
+    return flat
+
+
+def _normalize(value: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', value.lower())
+
+
+def _value_index(user_data: Dict) -> Dict[str, tuple]:
+    """Every user value and every format of it -> (user data key, format name or None)"""
+    flat = flatten_user_data(user_data)
+    compiled = compile_profile(flat)
+    index = {}
+    for path, value in flat.items():
+        if not value:
+            continue
+        for text, value_format in [(value, None)] + [
+                (variant, name) for name, variant in compiled.variants.get(path, {}).items()
+                if name != 'raw']:
+            index.setdefault(text, (path, value_format))
+            if _normalize(text):
+                index.setdefault(_normalize(text), (path, value_format))
+    return index
+
+
+def _select_options(form_fields: List[Dict]) -> Dict[str, List[Dict]]:
+    """Options of each select, by selector"""
+    return {field.get('selector', ''): field['options']
+            for field in form_fields or [] if field.get('options')}
+
+
+def _find_option(options: List[Dict], candidates: List[str]) -> Optional[Dict]:
+    """The option whose value or text equals a candidate, exactly or normalized"""
+    for compare in (lambda text: text, _normalize):
+        for candidate in candidates:
+            wanted = compare(str(candidate))
+            if not wanted:
+                continue
+            for option in options:
+                if wanted in (compare(str(option.get('value', ''))), compare(str(option.get('text', '')))):
+                    return option
+    return None
+
+
+def unbind_instructions(instructions: List[Dict], user_data: Dict,
+                        form_fields: List[Dict] = None) -> Optional[List[Dict]]:
+    """Replace user values in instructions with references to user data keys.
+
+    Every non-empty value must map back to a user data key, directly or as one
+    of its compiled formats (e.g. 09/12/2006 for 2006-09-12). A select answer
+    must be an option whose value or text is one of the user's values; it is
+    kept as a reference too, and bound to the matching option of the next
+    user's value. Returns None otherwise: the value may be derived from this
+    user's data in a way we can't tell (an option picked for 'US Citizen'),
+    and caching it would hand it to the next user.
+    """
+    index = _value_index(user_data)
+    selects = _select_options(form_fields)
+
+    def lookup(text: str) -> Optional[tuple]:
+        return index.get(text) or (_normalize(text) and index.get(_normalize(text))) or None
+
+    unbound = []
+    for instruction in instructions:
+        instruction = dict(instruction)
+        value = instruction.get('value')
+        if value not in (None, ''):
+            if not isinstance(value, str):
+                return None
+            options = selects.get(instruction.get('selector', ''))
+            if options:
+                option = _find_option(options, [value])
+                ref = option and (lookup(str(option.get('value', ''))) or lookup(str(option.get('text', ''))))
+                if not ref:
+                    return None
+                instruction['value_ref'] = ref[0]
+                instruction['value_format'] = 'option'
+            else:
+                ref = lookup(value)
+                if not ref:
+                    return None
+                instruction['value_ref'], value_format = ref
+                if value_format:
+                    instruction['value_format'] = value_format
+            instruction['value'] = ''
+        unbound.append(instruction)
+    return unbound
+
+
+def bind_instructions(instructions: List[Dict], user_data: Dict,
+                      form_fields: List[Dict] = None) -> Optional[List[Dict]]:
+    """Re-bind cached instructions to a user's values, in the cached format.
+
+    Select answers become the option matching any format of the user's value.
+    Returns None when one has no matching option, so the form is analyzed
+    for this user instead.
+    """
+    flat = flatten_user_data(user_data)
+    compiled = None
+    selects = None
+    bound = []
+    for instruction in instructions:
+        instruction = dict(instruction)
+        path = instruction.pop('value_ref', None)
+        value_format = instruction.pop('value_format', None)
+        if path is not None:
+            value = flat.get(path)
+            if not value:
+                # This user has nothing for the field
+                continue
+            compiled = compiled or compile_profile(flat)
+            if value_format == 'option':
+                selects = selects if selects is not None else _select_options(form_fields)
+                option = _find_option(selects.get(instruction.get('selector', ''), []),
+                                      compiled.options_for(path) or [value])
+                if option is None:
+                    return None
+                value = str(option.get('value', ''))
+            elif value_format:
+                value = compiled.variants.get(path, {}).get(value_format, value)
+            instruction['value'] = value
+        bound.append(instruction)
+    return bound
+
+
+class FormAnalysisCache:
+    """LRU cache with TTL for form analyses, backed by an on-disk SQLite store"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 512, ttl: float = 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.path:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with self._connect() as conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS form_cache ("
+                        "fingerprint TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                        "expires_at REAL NOT NULL)"
+                    )
+            except Exception as e:
+                print(f"Error opening form cache store: {e}")
+                self.path = None
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis for a fingerprint, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(fingerprint)
+                    return payload
+                del self._entries[fingerprint]
+
+        if not self.path:
+            return None
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload, expires_at FROM form_cache WHERE fingerprint = ?",
+                    (fingerprint,)
+                ).fetchone()
+                if row and row[1] <= now:
+                    conn.execute("DELETE FROM form_cache WHERE fingerprint = ?", (fingerprint,))
+                    row = None
+        except Exception as e:
+            print(f"Error reading form cache: {e}")
+            return None
+
+        if not row:
+            return None
+
+        payload = json.loads(row[0])
+        self._remember(fingerprint, payload, row[1])
+        return payload
+
+    def put(self, fingerprint: str, payload: Dict[str, Any]):
+        """Store an analysis in memory and on disk"""
+        expires_at = time.time() + self.ttl
+        self._remember(fingerprint, payload, expires_at)
+
+        if not self.path:
+            return
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO form_cache (fingerprint, payload, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (fingerprint, json.dumps(payload), expires_at)
+                )
+        except Exception as e:
+            print(f"Error writing form cache: {e}")
+
+    def _remember(self, fingerprint: str, payload: Dict[str, Any], expires_at: float):
+        with self._lock:
+            self._entries[fingerprint] = (expires_at, payload)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def purge_expired(self):
+        """Drop expired entries from memory and disk"""
+        now = time.time()
+        with self._lock:
+            for fingerprint in [fp for fp, (exp, _) in self._entries.items() if exp <= now]:
+                del self._entries[fingerprint]
+
+        if self.path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM form_cache WHERE expires_at <= ?", (now,))
+            except Exception as e:
+                print(f"Error purging form cache: {e}")
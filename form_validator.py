@@ -0,0 +1,220 @@
+# form_validator.py
+import re
+from typing import Any, Dict, List, Optional
+
+from field_matcher import normalize_token
+from profile_variants import date_variants
+from prompt_encoder import NON_FILLABLE_TYPES
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[A-Za-z]{2,}$')
+ZIP_PATTERN = re.compile(r'^\d{5}(-\d{4})?$')
+# Any country's postal code: 3-10 letters, digits, spaces or dashes, at least one digit
+POSTAL_PATTERN = re.compile(r'^(?=.*\d)[A-Za-z0-9][A-Za-z0-9 -]{1,8}[A-Za-z0-9]$')
+
+# Field kinds recognized from whole words of the name, id or label when the input
+# type doesn't say; two adjacent words also count joined ("e-mail", "zip code")
+KIND_HINTS = [
+    ('email', {'email'}),
+    ('phone', {'phone', 'telephone', 'tel', 'mobile', 'cell', 'cellphone'}),
+    ('zip', {'zip', 'zipcode', 'postal', 'postcode'}),
+    ('date', {'dob', 'date', 'birthday', 'birthdate'}),
+]
+
+# Word and character limits stated in a label, e.g. "Essay (max 500 words)"
+LIMIT_PATTERN = re.compile(r'(\d[\d,]*)\s*(words?|characters?|chars?)\b', re.I)
+
+# Free text this long or longer can only be judged for relevance by a model
+FREE_TEXT_MIN_CHARS = 200
+
+PASS = 'pass'
+FAIL = 'fail'
+UNDECIDED = 'undecided'
+
+
+def _words(field: Dict[str, Any]) -> set:
+    """Words of the field's name, id, label and placeholder, plus adjacent pairs joined"""
+    words = set()
+    for key in ('name', 'id', 'label', 'placeholder'):
+        parts = normalize_token(str(field.get(key) or '')).split('_')
+        words.update(parts)
+        words.update(first + second for first, second in zip(parts, parts[1:]))
+    return words
+
+
+def field_kind(field: Dict[str, Any]) -> Optional[str]:
+    """email, phone, zip, date, number, select or text; None when nothing applies"""
+    field_type = (field.get('type') or '').lower()
+    if field.get('tag') == 'select' or field_type == 'select' or field.get('options'):
+        return 'select'
+    if field.get('tag') == 'textarea' or field_type == 'textarea':
+        return 'text'
+    if field_type in ('email', 'date', 'number'):
+        return field_type
+    if field_type == 'tel':
+        return 'phone'
+    if field_type in ('checkbox', 'radio', 'file', 'hidden', 'submit', 'button'):
+        return None
+    words = _words(field)
+    for kind, hints in KIND_HINTS:
+        if words & hints:
+            return kind
+    return 'text'
+
+
+def length_limits(field: Dict[str, Any]) -> Dict[str, int]:
+    """Character and word limits from maxlength/minlength attributes or the label"""
+    limits = {}
+    for key, name in (('maxlength', 'maxChars'), ('maxLength', 'maxChars'),
+                      ('minlength', 'minChars'), ('minLength', 'minChars'),
+                      ('maxWords', 'maxWords'), ('minWords', 'minWords')):
+        try:
+            if field.get(key) not in (None, ''):
+                limits[name] = int(field[key])
+        except (TypeError, ValueError):
+            pass
+    match = LIMIT_PATTERN.search(f"{field.get('label') or ''} {field.get('placeholder') or ''}")
+    if match:
+        count = int(match.group(1).replace(',', ''))
+        limits.setdefault('maxWords' if match.group(2).lower().startswith('word') else 'maxChars', count)
+    return limits
+
+
+def _check_format(kind: str, value: str, field: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """An error for a value that doesn't fit its kind, else None"""
+    if kind == 'email' and not EMAIL_PATTERN.match(value):
+        return {'code': 'invalid_email', 'message': f"'{value}' is not an email address"}
+    if kind == 'phone':
+        digits = re.sub(r'\D', '', value)
+        if re.search(r'[A-Za-z]', value):
+            return {'code': 'invalid_phone', 'message': f"'{value}' is not a phone number"}
+        # A country code other than +1 or a trunk 0 means a non-US number: only its length is checked
+        if (value.startswith('+') and not re.match(r'\+\s*1', value)) or digits.startswith('0'):
+            if not 7 <= len(digits) <= 15:
+                return {'code': 'invalid_phone', 'message': f"'{value}' is not a phone number"}
+        else:
+            if len(digits) == 11 and digits.startswith('1'):
+                digits = digits[1:]
+            if len(digits) != 10:
+                return {'code': 'invalid_phone', 'message': f"'{value}' is not a 10-digit phone number"}
+    if kind == 'zip':
+        # Only a numeric value in a field called ZIP is held to the US format
+        if re.fullmatch(r'[\d -]+', value) and _words(field) & {'zip', 'zipcode'}:
+            if not ZIP_PATTERN.match(value):
+                return {'code': 'invalid_zip', 'message': f"'{value}' is not a ZIP code"}
+        elif not POSTAL_PATTERN.match(value):
+            return {'code': 'invalid_zip', 'message': f"'{value}' is not a postal code"}
+    if kind == 'date' and not date_variants(value):
+        return {'code': 'invalid_date', 'message': f"'{value}' is not a recognizable date"}
+    if kind == 'number':
+        try:
+            number = float(value)
+        except ValueError:
+            return {'code': 'invalid_number', 'message': f"'{value}' is not a number"}
+        for key, compare, word in (('min', lambda n, b: n < b, 'below'), ('max', lambda n, b: n > b, 'above')):
+            try:
+                bound = float(field[key]) if field.get(key) not in (None, '') else None
+            except (TypeError, ValueError):
+                bound = None
+            if bound is not None and compare(number, bound):
+                return {'code': 'out_of_range', 'message': f"{value} is {word} the {key} of {field[key]}"}
+    if kind == 'select':
+        options = field.get('options')
+        if options:
+            wanted = value.strip().lower()
+            allowed = {str(option.get(key, '')).strip().lower()
+                       for option in options for key in ('value', 'text')}
+            if wanted not in allowed:
+                return {'code': 'not_an_option', 'message': f"'{value}' is not one of the field's options"}
+    return None
+
+
+def _check_length(value: str, limits: Dict[str, int]) -> Optional[Dict[str, str]]:
+    words = len(value.split())
+    if 'maxChars' in limits and len(value) > limits['maxChars']:
+        return {'code': 'too_long', 'message': f"{len(value)} characters, limit is {limits['maxChars']}"}
+    if 'minChars' in limits and len(value) < limits['minChars']:
+        return {'code': 'too_short', 'message': f"{len(value)} characters, minimum is {limits['minChars']}"}
+    if 'maxWords' in limits and words > limits['maxWords']:
+        return {'code': 'too_long', 'message': f"{words} words, limit is {limits['maxWords']}"}
+    if 'minWords' in limits and words < limits['minWords']:
+        return {'code': 'too_short', 'message': f"{words} words, minimum is {limits['minWords']}"}
+    return None
+
+
+def validate_field(field: Dict[str, Any], value: Any) -> Dict[str, Any]:
+    """Verdict for one field: pass, fail (with errors) or undecided"""
+    result = {
+        'selector': field.get('selector', ''),
+        'label': field.get('label') or field.get('name') or '',
+        'kind': field_kind(field),
+        'status': PASS,
+        'errors': []
+    }
+    text = '' if value is None else str(value).strip()
+    if not text:
+        if field.get('required'):
+            result['errors'].append({'code': 'required', 'message': 'Required field is empty'})
+        result['status'] = FAIL if result['errors'] else PASS
+        return result
+
+    error = _check_format(result['kind'], text, field) if result['kind'] else None
+    if error:
+        result['errors'].append(error)
+    limits = length_limits(field)
+    error = _check_length(text, limits) if limits else None
+    if error:
+        result['errors'].append(error)
+
+    if result['errors']:
+        result['status'] = FAIL
+    elif result['kind'] == 'text' and (field.get('tag') == 'textarea' or len(text) >= FREE_TEXT_MIN_CHARS):
+        # Format and length are fine; whether it answers the question is not a rule
+        result['status'] = UNDECIDED
+    return result
+
+
+def validate_form(filled_fields: List[Dict[str, Any]], expected_fields: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Check filled values against the form's fields without any model call.
+
+    filled_fields are {selector, value} as reported by the filler;
+    expected_fields describe the form (as extracted by _extract_form_fields,
+    plus optional maxlength/minlength/maxWords/min/max). Fields only in
+    filled_fields are checked as plain text.
+    """
+    expected = {field.get('selector'): field for field in (expected_fields or []) if field.get('selector')}
+    values = {}
+    for filled in filled_fields or []:
+        if filled.get('selector'):
+            values[filled['selector']] = filled.get('value')
+
+    results = []
+    for selector, field in expected.items():
+        if field.get('type') in NON_FILLABLE_TYPES:
+            continue
+        results.append(validate_field(field, values.get(selector)))
+    for selector, value in values.items():
+        if selector not in expected:
+            results.append(validate_field({'selector': selector}, value))
+
+    return verdict(results)
+
+
+def verdict(results: List[Dict[str, Any]], decided_by: str = 'local') -> Dict[str, Any]:
+    """Summary over field results; the form is valid when no field failed"""
+    counts = {PASS: 0, FAIL: 0, UNDECIDED: 0}
+    for result in results:
+        counts[result['status']] += 1
+    return {
+        'isValid': counts[FAIL] == 0,
+        'complete': counts[UNDECIDED] == 0,
+        'decidedBy': decided_by,
+        'summary': {
+            'fields': len(results),
+            'passed': counts[PASS],
+            'failed': counts[FAIL],
+            'undecided': counts[UNDECIDED],
+            'missingRequired': sum(1 for result in results
+                                   if any(error['code'] == 'required' for error in result['errors']))
+        },
+        'fields': results
+    }
@@ -0,0 +1,84 @@
+# instruction_stream.py
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+INSTRUCTIONS_KEY = re.compile(r'"instructions"\s*:\s*\[')
+
+
+class InstructionStreamParser:
+    """Incrementally parses a streamed analysis response.
+
+    Text is fed as it arrives from the model; each call returns the entries of
+    the "instructions" array that have been completed since the last call, so
+    they can be forwarded before the rest of the response is generated.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = None
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Add streamed text and return newly completed instructions"""
+        self.buffer += text
+        completed = []
+        if self._done:
+            return completed
+
+        if not self._in_array:
+            match = INSTRUCTIONS_KEY.search(self.buffer)
+            if not match:
+                return completed
+            self._in_array = True
+            self._pos = match.end()
+
+        buffer = self.buffer
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0 and char == '{':
+                    self._start = i
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:
+                    # End of the instructions array
+                    self._done = True
+                    i += 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._start is not None:
+                    try:
+                        completed.append(json.loads(buffer[self._start:i + 1]))
+                    except json.JSONDecodeError:
+                        print("Skipping malformed streamed instruction")
+                    self._start = None
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Parse the complete response once the stream has ended"""
+        match = re.search(r'\{.*\}', self.buffer, re.DOTALL)
+        if not match:
+            return None
+        try:
+            return json.loads(match.group())
+        except json.JSONDecodeError:
+            return None
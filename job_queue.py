@@ -0,0 +1,271 @@
+# job_queue.py
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlite_store import write_transaction
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobStore:
+    """Job states shared by every web worker process through SQLite.
+
+    Whichever process queued a job, any process can report its status and
+    result or ask it to stop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with write_transaction(self.path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+                "cancel_requested INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, finished_at REAL, "
+                "result TEXT, error TEXT)"
+            )
+
+    def add(self, job_id: str):
+        with write_transaction(self.path) as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, created_at) VALUES (?, ?, ?)",
+                (job_id, QUEUED, time.time())
+            )
+
+    def start(self, job_id: str) -> bool:
+        """Mark a queued job running; False if it was cancelled before it started"""
+        with write_transaction(self.path) as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE job_id = ? AND status = ?", (job_id, QUEUED)
+            ).fetchone()
+            if not row or row[0]:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ? AND status = ?",
+                    (CANCELLED, time.time(), job_id, QUEUED)
+                )
+                return False
+            conn.execute("UPDATE jobs SET status = ? WHERE job_id = ?", (RUNNING, job_id))
+            return True
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: str = None):
+        with write_transaction(self.path) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? "
+                "WHERE job_id = ? AND status NOT IN (?, ?, ?)",
+                (status, time.time(), None if result is None else json.dumps(result, default=str),
+                 error, job_id, *FINISHED)
+            )
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag a queued or running job to stop; False if unknown or finished"""
+        with write_transaction(self.path) as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status IN (?, ?)",
+                (job_id, QUEUED, RUNNING)
+            )
+            return updated.rowcount > 0
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """Plain read, no write lock: polled between every step of a running job"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return bool(row and row[0])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            row = conn.execute(
+                "SELECT status, cancel_requested, created_at, finished_at, result, error "
+                "FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        status, cancel_requested, created_at, finished_at, result, error = row
+        return {
+            'status': status,
+            'cancel_requested': bool(cancel_requested),
+            'created_at': created_at,
+            'finished_at': finished_at,
+            'result': None if result is None else json.loads(result),
+            'error': error
+        }
+
+    def counts(self) -> Dict[str, int]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+
+    def prune(self, max_age: float):
+        """Forget finished jobs older than max_age seconds"""
+        with write_transaction(self.path) as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (time.time() - max_age,)
+            )
+
+
+class _CancelFlag:
+    """Stands in for a threading.Event in the worker: set when any process cancelled the job"""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self._set = False
+
+    def is_set(self) -> bool:
+        if not self._set:
+            self._set = self.store.cancel_requested(self.job_id)
+        return self._set
+
+
+def _run_stored_job(fn: Callable, store_path: str, job_id: str, *args) -> Any:
+    """Run fn in a worker process, keeping the job's row in the store current"""
+    store = JobStore(store_path)
+    if not store.start(job_id):
+        return None
+    cancel_event = _CancelFlag(store, job_id)
+    try:
+        result = fn(cancel_event, *args)
+    except Exception as e:
+        store.finish(job_id, FAILED, error=str(e))
+        raise
+    store.finish(job_id, CANCELLED if cancel_event.is_set() else SUCCEEDED, result=result)
+    return result
+
+
+class JobQueue:
+    """Runs long jobs on a pool of worker processes with status polling and cancellation.
+
+    The job function is called as fn(cancel_event, *args) in a worker process
+    and should check cancel_event.is_set() between steps so running jobs can
+    stop early. Queued jobs are cancelled before they start. Job states live
+    in the SQLite store at store_path, so a job queued by one web worker can
+    be polled or cancelled through any other.
+    """
+
+    def __init__(self, fn: Callable, store_path: str, max_workers: int = 2,
+                 initializer: Optional[Callable] = None, result_ttl: float = 3600,
+                 on_result: Optional[Callable] = None):
+        self.fn = fn
+        self.store_path = store_path
+        self.store = JobStore(store_path)
+        self.max_workers = max(1, max_workers)
+        self.initializer = initializer
+        # Called in the submitting process with each successful job's result
+        self.on_result = on_result
+        self.result_ttl = result_ttl
+
+        # Futures of the jobs this process submitted
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            # Spawn so workers don't inherit the web server's threads and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=self.initializer
+            )
+
+    def submit(self, *args) -> str:
+        """Queue a job and return its id"""
+        job_id = uuid.uuid4().hex
+        self.store.prune(self.result_ttl)
+        self.store.add(job_id)
+        with self._lock:
+            self._ensure_started()
+            future = self._executor.submit(_run_stored_job, self.fn, self.store_path, job_id, *args)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda done: self._mark_finished(job_id, done))
+        return job_id
+
+    def _mark_finished(self, job_id: str, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+        if future.cancelled():
+            self.store.finish(job_id, CANCELLED)
+            return
+        error = future.exception()
+        if error is not None:
+            # A worker that died never got to record the failure
+            self.store.finish(job_id, FAILED, error=str(error))
+        elif self.on_result and future.result() is not None:
+            try:
+                self.on_result(future.result())
+            except Exception as e:
+                print(f"Error handling job result: {e}")
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the state of a job, including its result once finished"""
+        job = self.store.get(job_id)
+        if not job:
+            return None
+
+        info = {
+            'jobId': job_id,
+            'createdAt': job['created_at'],
+            'finishedAt': job['finished_at'],
+            'status': job['status']
+        }
+        if job['status'] not in FINISHED and job['cancel_requested']:
+            info['status'] = 'cancelling'
+        if job['result'] is not None:
+            info['result'] = job['result']
+        if job['error'] is not None:
+            info['error'] = job['error']
+        return info
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job or ask a running one to stop"""
+        if not self.store.request_cancel(job_id):
+            return False
+
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of jobs by state across all processes"""
+        by_status = self.store.counts()
+        counts = {
+            'queued': by_status.get(QUEUED, 0),
+            'running': by_status.get(RUNNING, 0),
+            'finished': sum(by_status.get(status, 0) for status in FINISHED)
+        }
+        counts['workers'] = self.max_workers
+        return counts
+
+    def shutdown(self):
+        """Stop the worker processes, cancelling anything still queued"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
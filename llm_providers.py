@@ -0,0 +1,345 @@
+# llm_providers.py
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from prompt_encoder import count_tokens
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: appends rely on O_APPEND alone
+    fcntl = None
+
+# live: call the real APIs; record: call them and save every response;
+# replay: answer from saved responses without the network
+PROVIDER_MODES = ('live', 'record', 'replay')
+
+
+class ProviderError(Exception):
+    """A provider call failed (including errors injected by the replay profile)"""
+
+
+class ReplayMiss(ProviderError):
+    """Replay mode was asked a prompt that was never recorded"""
+
+
+def prompt_key(prompt: str) -> str:
+    """Key a recording by the exact prompt text"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class LLMProvider:
+    """Text completion from one model vendor.
+
+    complete() returns the whole response text; stream() yields it in pieces.
+    Settings are the per-call model, temperature and max_tokens.
+    """
+
+    name = 'provider'
+    # True when the provider needs no API key or network
+    offline = False
+
+    def complete(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> Iterator[str]:
+        yield self.complete(prompt, system, json_mode, **settings)
+
+
+class OpenAIProvider(LLMProvider):
+    name = 'openai'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _request(self, prompt: str, system: str, json_mode: bool, settings: Dict, stream: bool = False):
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        options = {}
+        if json_mode:
+            options['response_format'] = {"type": "json_object"}
+        if 'max_tokens' in settings:
+            options['max_tokens'] = settings['max_tokens']
+        return self.client.chat.completions.create(
+            model=settings.get('model', 'gpt-4'),
+            messages=messages,
+            temperature=settings.get('temperature', 0.1),
+            stream=stream,
+            **options
+        )
+
+    def complete(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> str:
+        response = self._request(prompt, system, json_mode, settings)
+        return response.choices[0].message.content
+
+    def stream(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> Iterator[str]:
+        for chunk in self._request(prompt, system, json_mode, settings, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class AnthropicProvider(LLMProvider):
+    name = 'anthropic'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _options(self, prompt: str, system: str, settings: Dict) -> Dict[str, Any]:
+        options = {
+            'model': settings.get('model', 'claude-3-opus-20240229'),
+            'messages': [{"role": "user", "content": prompt}],
+            'max_tokens': settings.get('max_tokens', 2000),
+            'temperature': settings.get('temperature', 0.1)
+        }
+        if system:
+            options['system'] = system
+        return options
+
+    def complete(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> str:
+        response = self.client.messages.create(**self._options(prompt, system, settings))
+        return response.content[0].text
+
+    def stream(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> Iterator[str]:
+        with self.client.messages.stream(**self._options(prompt, system, settings)) as stream:
+            for text in stream.text_stream:
+                yield text
+
+
+class RecordingStore:
+    """Responses keyed by prompt hash, persisted as append-only JSON lines.
+
+    Each save appends one line under an exclusive file lock, so any number of
+    threads and processes can record into the same file. When a prompt was
+    recorded more than once, the last line wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._recordings = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._recordings is None:
+            self._recordings = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            recording = json.loads(line)
+                            self._recordings[recording.pop('key')] = recording
+                        except (ValueError, KeyError, AttributeError) as e:
+                            # A line cut short by a crash loses only that recording
+                            print(f"Skipping bad recording on line {number} of {self.path}: {e}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error loading recordings from {self.path}: {e}")
+        return self._recordings
+
+    def get(self, prompt: str) -> Optional[Dict]:
+        with self._lock:
+            return self._load().get(prompt_key(prompt))
+
+    def save(self, prompt: str, response: str, provider: str):
+        recording = {
+            'provider': provider,
+            'response': response,
+            'prompt_tokens': count_tokens(prompt),
+            'recorded_at': time.time()
+        }
+        key = prompt_key(prompt)
+        line = (json.dumps({'key': key, **recording}) + '\n').encode('utf-8')
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            if self._recordings is not None:
+                self._recordings[key] = recording
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps a live provider and saves every response for later replay"""
+
+    def __init__(self, inner: LLMProvider, store: RecordingStore):
+        self.inner = inner
+        self.store = store
+        self.name = inner.name
+
+    def complete(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> str:
+        response = self.inner.complete(prompt, system, json_mode, **settings)
+        self.store.save(prompt, response, self.name)
+        return response
+
+    def stream(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> Iterator[str]:
+        pieces = []
+        for text in self.inner.stream(prompt, system, json_mode, **settings):
+            pieces.append(text)
+            yield text
+        self.store.save(prompt, ''.join(pieces), self.name)
+
+
+class ReplayProfile:
+    """How a replayed provider behaves: latency, throughput and failures.
+
+    latency_ms (+/- jitter_ms) is the time to the first token. A tail_rate
+    fraction of calls takes tail_latency_ms instead, which is what hedging
+    reacts to. Output then arrives at tokens_per_second (0 for instant), and
+    an error_rate fraction of calls raises ProviderError.
+    """
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, tokens_per_second: float = 0,
+                 error_rate: float = 0, tail_rate: float = 0, tail_latency_ms: float = 0,
+                 seed: int = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_latency_ms = tail_latency_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, overrides: Dict[str, Any] = None):
+        """Profile from LLM_REPLAY_* environment variables, with per-provider overrides"""
+        settings = {
+            'latency_ms': float(os.getenv('LLM_REPLAY_LATENCY_MS', 0)),
+            'jitter_ms': float(os.getenv('LLM_REPLAY_JITTER_MS', 0)),
+            'tokens_per_second': float(os.getenv('LLM_REPLAY_TOKENS_PER_SECOND', 0)),
+            'error_rate': float(os.getenv('LLM_REPLAY_ERROR_RATE', 0)),
+            'tail_rate': float(os.getenv('LLM_REPLAY_TAIL_RATE', 0)),
+            'tail_latency_ms': float(os.getenv('LLM_REPLAY_TAIL_LATENCY_MS', 0)),
+            'seed': int(os.environ['LLM_REPLAY_SEED']) if os.getenv('LLM_REPLAY_SEED') else None
+        }
+        settings.update(overrides or {})
+        return cls(**settings)
+
+    def draw(self) -> tuple:
+        """(first-token delay in seconds, whether this call fails)"""
+        with self._lock:
+            if self.tail_rate and self._random.random() < self.tail_rate:
+                delay = self.tail_latency_ms
+            else:
+                delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            failed = bool(self.error_rate) and self._random.random() < self.error_rate
+        return max(0.0, delay) / 1000, failed
+
+    def output_seconds(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+
+class ReplayProvider(LLMProvider):
+    """Offline stand-in that answers from recorded responses.
+
+    Unrecorded prompts raise ReplayMiss, so callers fall back as they would
+    on a failed call. Timing and failures follow the profile, so hedging,
+    rate limiting and concurrency can be load tested without keys or network.
+    """
+
+    offline = True
+
+    def __init__(self, name: str, store: RecordingStore, profile: ReplayProfile = None):
+        self.name = name
+        self.store = store
+        self.profile = profile or ReplayProfile()
+        self.calls = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _response(self, prompt: str) -> str:
+        recording = self.store.get(prompt)
+        with self._lock:
+            self.calls += 1
+            if recording is None:
+                self.misses += 1
+        if recording is None:
+            raise ReplayMiss(f"No recorded {self.name} response for this prompt")
+        return recording['response']
+
+    def complete(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> str:
+        response = self._response(prompt)
+        delay, failed = self.profile.draw()
+        time.sleep(delay + self.profile.output_seconds(count_tokens(response)))
+        if failed:
+            raise ProviderError(f"Injected {self.name} replay error")
+        return response
+
+    def stream(self, prompt: str, system: str = None, json_mode: bool = False, **settings) -> Iterator[str]:
+        response = self._response(prompt)
+        delay, failed = self.profile.draw()
+        time.sleep(delay)
+        if failed:
+            raise ProviderError(f"Injected {self.name} replay error")
+
+        # About four tokens per piece, paced at the profile's throughput
+        piece_chars = 16
+        for start in range(0, len(response), piece_chars):
+            piece = response[start:start + piece_chars]
+            time.sleep(self.profile.output_seconds(count_tokens(piece)))
+            yield piece
+
+
+def provider_mode() -> str:
+    mode = os.getenv('LLM_PROVIDER_MODE', 'live').lower()
+    if mode not in PROVIDER_MODES:
+        print(f"Unknown LLM_PROVIDER_MODE '{mode}', using live")
+        return 'live'
+    return mode
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def recording_store(path: str = None) -> RecordingStore:
+    """Shared store for a recordings file (LLM_RECORDINGS_PATH by default)"""
+    path = path or os.getenv('LLM_RECORDINGS_PATH', 'cache/llm_recordings.jsonl')
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = RecordingStore(path)
+        return _stores[path]
+
+
+def create_provider(name: str, client=None, profile: Dict[str, Any] = None) -> Optional[LLMProvider]:
+    """Provider for 'openai' or 'anthropic' according to LLM_PROVIDER_MODE.
+
+    Live and record modes need a client and return None without one; replay
+    mode ignores the client. Replay profiles come from LLM_REPLAY_* and the
+    provider's entry in LLM_REPLAY_PROFILES, then the profile argument.
+    """
+    mode = provider_mode()
+    if mode == 'replay':
+        overrides = {}
+        try:
+            # e.g. {"openai": {"latency_ms": 4000}, "anthropic": {"latency_ms": 1500}}
+            overrides.update(json.loads(os.getenv('LLM_REPLAY_PROFILES', '{}')).get(name, {}))
+        except (ValueError, AttributeError) as e:
+            print(f"Ignoring invalid LLM_REPLAY_PROFILES: {e}")
+        overrides.update(profile or {})
+        return ReplayProvider(name, recording_store(), ReplayProfile.from_env(overrides))
+
+    if client is None:
+        return None
+    provider = OpenAIProvider(client) if name == 'openai' else AnthropicProvider(client)
+    if mode == 'record':
+        return RecordingProvider(provider, recording_store())
+    return provider
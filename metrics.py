@@ -0,0 +1,169 @@
+# metrics.py
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(labelnames, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative histogram with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS,
+                 labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS,
+                  labelnames: Iterable[str] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry served by /metrics
+registry = MetricsRegistry()
+
+html_parse_seconds = registry.histogram(
+    'autofill_html_parse_seconds', 'Time to parse form HTML and extract its fields'
+)
+form_field_count = registry.histogram(
+    'autofill_form_fields', 'Fields extracted per analyzed form',
+    buckets=(5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+prompt_tokens = registry.histogram(
+    'autofill_prompt_tokens', 'Tokens per analysis prompt',
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+)
+provider_latency_seconds = registry.histogram(
+    'autofill_provider_latency_seconds', 'AI provider response time',
+    labelnames=('provider', 'model')
+)
+analyses_total = registry.counter(
+    'autofill_analyses_total', 'Form analyses by outcome (ai, cached or fallback)',
+    labelnames=('outcome',)
+)
+rate_limit_rejections_total = registry.counter(
+    'autofill_rate_limit_rejections_total', 'AI calls refused by the rate limiter',
+    labelnames=('provider',)
+)
+fill_field_seconds = registry.histogram(
+    'autofill_fill_field_seconds', 'Time to fill a single form field',
+    labelnames=('type',)
+)
+page_load_seconds = registry.histogram(
+    'autofill_page_load_seconds', 'Time until the form page reached DOMContentLoaded'
+)
+browser_rss_bytes = registry.histogram(
+    'autofill_browser_rss_bytes', 'Resident memory of a browser after a fill, all processes',
+    buckets=tuple(mb * 1024 * 1024 for mb in (100, 200, 300, 400, 600, 800, 1200, 1600, 2400))
+)
+validations_total = registry.counter(
+    'autofill_validations_total', 'Filled form validations by who decided them (local or local+llm)',
+    labelnames=('decided_by',)
+)
@@ -0,0 +1,116 @@
+# page_waits.py
+import time
+from typing import Dict
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# How often waits re-check their condition, in seconds (WebDriverWait's default is 0.5)
+POLL_INTERVAL = 0.05
+
+# The network counts as idle after this long without a request starting or finishing
+NETWORK_QUIET_MS = 500
+
+# Pages with polling or analytics beacons may never go idle; don't wait longer than this
+NETWORK_IDLE_TIMEOUT = 5
+
+FORM_PRESENT_SCRIPT = "return !!document.querySelector('form, input, textarea, select');"
+
+# Counts in-flight fetch/XHR requests (hooks are installed on first call) and
+# reports how many resources the page has loaded so far
+NETWORK_ACTIVITY_SCRIPT = """
+if (!window.__autofillNetwork) {
+    const state = window.__autofillNetwork = {inflight: 0};
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function() {
+            state.inflight++;
+            return originalFetch.apply(this, arguments).finally(() => { state.inflight--; });
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        state.inflight++;
+        this.addEventListener('loadend', () => { state.inflight--; }, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+}
+return [document.readyState, window.__autofillNetwork.inflight,
+        performance.getEntriesByType('resource').length];
+"""
+
+
+def wait_for(driver, condition, timeout: float):
+    """WebDriverWait.until with a short poll interval; returns None on timeout"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        return None
+
+
+def wait_for_document_ready(driver, timeout: float) -> bool:
+    """Wait until the DOM is parsed (readyState interactive or complete)"""
+    return bool(wait_for(
+        driver,
+        lambda d: d.execute_script("return document.readyState") in ('interactive', 'complete'),
+        timeout
+    ))
+
+
+def wait_for_form(driver, timeout: float) -> bool:
+    """Wait until the page contains a form or form control"""
+    return bool(wait_for(driver, lambda d: d.execute_script(FORM_PRESENT_SCRIPT), timeout))
+
+
+def wait_for_network_idle(driver, timeout: float = NETWORK_IDLE_TIMEOUT,
+                          quiet_ms: float = NETWORK_QUIET_MS) -> bool:
+    """Wait until no fetch/XHR is in flight and no resource has loaded for quiet_ms"""
+    state = {'resources': None, 'since': time.monotonic()}
+
+    def idle(d):
+        ready_state, inflight, resources = d.execute_script(NETWORK_ACTIVITY_SCRIPT)
+        now = time.monotonic()
+        if inflight or resources != state['resources'] or ready_state == 'loading':
+            state['resources'] = resources
+            state['since'] = now
+            return False
+        return (now - state['since']) * 1000 >= quiet_ms
+
+    return bool(wait_for(driver, idle, timeout))
+
+
+def wait_for_page(driver, timeout: float, network_idle_timeout: float = NETWORK_IDLE_TIMEOUT) -> Dict[str, float]:
+    """Wait for a freshly loaded form page: document ready, form present, network idle.
+
+    Each stage returns as soon as its condition holds. A stage that times out
+    is reported but doesn't stop the fill, which then works with whatever
+    rendered. Returns the seconds spent per stage, negative if it timed out.
+    """
+    timings = {}
+    started = time.monotonic()
+    for stage, wait in (
+        ('documentReady', lambda: wait_for_document_ready(driver, timeout)),
+        ('formPresent', lambda: wait_for_form(driver, timeout)),
+        ('networkIdle', lambda: wait_for_network_idle(driver, min(timeout, network_idle_timeout)))
+    ):
+        stage_started = time.monotonic()
+        ok = wait()
+        elapsed = round(time.monotonic() - stage_started, 3)
+        timings[stage] = elapsed if ok else -elapsed
+        if not ok:
+            print(f"Page wait '{stage}' timed out after {elapsed}s, continuing")
+    timings['total'] = round(time.monotonic() - started, 3)
+    return timings
+
+
+def wait_until_interactable(driver, element, timeout: float) -> bool:
+    """Wait until an element is visible and enabled"""
+    return bool(wait_for(driver, EC.element_to_be_clickable(element), timeout))
+
+
+def pause(pacing: Dict[str, float], key: str, factor: float = 1.0):
+    """Sleep for a pacing delay, only if the user configured one"""
+    seconds = pacing.get(key)
+    if seconds:
+        time.sleep(seconds * factor)
@@ -0,0 +1,309 @@
+# profile_variants.py
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon',
+    'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia',
+    'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+    'PR': 'Puerto Rico', 'GU': 'Guam', 'VI': 'U.S. Virgin Islands', 'AS': 'American Samoa',
+    'MP': 'Northern Mariana Islands',
+}
+STATE_ABBREVIATIONS = {name.lower(): abbr for abbr, name in US_STATES.items()}
+
+COUNTRIES = [
+    {'name': 'United States', 'long': 'United States of America', 'iso3': 'USA', 'iso2': 'US',
+     'dotted': 'U.S.'},
+]
+COUNTRY_ALIASES = {alias.lower(): country for country in COUNTRIES for alias in country.values()}
+
+# Which kind of value a profile key holds (last segment of dotted paths, either case style)
+KIND_BY_KEY = {
+    'phone': 'phone', 'phone_number': 'phone', 'phoneNumber': 'phone',
+    'date_of_birth': 'date', 'dateOfBirth': 'date', 'birth_date': 'date', 'birthDate': 'date',
+    'state': 'state',
+    'country': 'country',
+    'gpa': 'gpa',
+    'graduation_year': 'year', 'graduationYear': 'year',
+    'zip': 'zip', 'zip_code': 'zip', 'zipCode': 'zip',
+}
+
+# Sibling keys giving the scale a GPA is on, e.g. {"gpa": "4.5", "gpa_scale": "5"}
+GPA_SCALE_KEYS = ('gpa_scale', 'gpaScale')
+
+# A GPA stating its own scale: "3.9/4.0", "4.5 out of 5"
+GPA_WITH_SCALE = re.compile(r'^(\d+(?:\.\d+)?)\s*(?:/|out\s+of)\s*(\d+(?:\.\d+)?)$', re.I)
+
+# Variant used for a transform hint naming only the kind, e.g. "transform": "phone"
+DEFAULT_FORMATS = {
+    'phone': 'dashed',
+    'date': 'us',
+    'state': 'abbr',
+    'country': 'name',
+    'gpa': 'two_decimals',
+    'year': 'year',
+    'zip': 'zip5',
+}
+
+# Variant an HTML input of this type requires, whatever the analyzer suggested
+INPUT_TYPE_FORMATS = {
+    'date': 'iso',
+    'month': 'iso_month',
+}
+
+# Formats holding only part of a value (a date's month, ...), never offered as the whole value
+PARTIAL_FORMATS = {
+    'date': {'iso_month', 'year', 'month', 'month_name', 'day'},
+}
+
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%m/%d/%y', '%B %d, %Y', '%b %d, %Y',
+                '%d %B %Y', '%Y/%m/%d']
+
+# Compiled profiles kept per process, keyed by profile hash
+MAX_COMPILED_PROFILES = 256
+
+
+def phone_variants(value: str) -> Dict[str, str]:
+    digits = re.sub(r'\D', '', value)
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    if len(digits) != 10:
+        return {'digits': digits} if digits else {}
+    area, exchange, line = digits[:3], digits[3:6], digits[6:]
+    return {
+        'digits': digits,
+        'dashed': f"{area}-{exchange}-{line}",
+        'dotted': f"{area}.{exchange}.{line}",
+        'parens': f"({area}) {exchange}-{line}",
+        'e164': f"+1{digits}",
+        'international': f"+1 {area}-{exchange}-{line}",
+    }
+
+
+def date_variants(value: str) -> Dict[str, str]:
+    text = value.strip()
+    if re.match(r'\d{4}-\d{2}-\d{2}T', text):
+        text = text[:10]
+    for date_format in DATE_FORMATS:
+        try:
+            date = datetime.strptime(text, date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        return {}
+    return {
+        'iso': date.strftime('%Y-%m-%d'),
+        'iso_month': date.strftime('%Y-%m'),
+        'us': date.strftime('%m/%d/%Y'),
+        'us_short': f"{date.month}/{date.day}/{date.year}",
+        'long': f"{date.strftime('%B')} {date.day}, {date.year}",
+        'year': str(date.year),
+        'month': date.strftime('%m'),
+        'month_name': date.strftime('%B'),
+        'day': date.strftime('%d'),
+    }
+
+
+def state_variants(value: str) -> Dict[str, str]:
+    text = value.strip()
+    abbr = text.upper() if text.upper() in US_STATES else STATE_ABBREVIATIONS.get(text.lower())
+    if not abbr:
+        return {}
+    return {'abbr': abbr, 'name': US_STATES[abbr]}
+
+
+def country_variants(value: str) -> Dict[str, str]:
+    return dict(COUNTRY_ALIASES.get(value.strip().lower(), {}))
+
+
+def gpa_variants(value: str, scale: Any = None) -> Dict[str, str]:
+    """Same GPA on common scales, converted linearly.
+
+    Only converted when the scale is known: stated in the value ("3.9/4.0",
+    "92%") or passed in. A bare number is only reformatted, since 4.3 may be
+    weighted on a 4.0 scale as well as on a 5.0 one.
+    """
+    text = value.strip()
+    match = GPA_WITH_SCALE.match(text)
+    try:
+        if match:
+            gpa, scale = float(match.group(1)), match.group(2)
+        elif text.endswith('%'):
+            gpa, scale = float(text[:-1]), 100
+        else:
+            gpa = float(text)
+        scale = float(scale) if scale not in (None, '') else None
+    except ValueError:
+        return {}
+    if gpa <= 0:
+        return {}
+    variants = {
+        'one_decimal': f"{gpa:.1f}",
+        'two_decimals': f"{gpa:.2f}",
+    }
+    if scale and gpa <= scale:
+        unweighted = gpa * 4 / scale
+        variants.update({
+            'scale_4': f"{unweighted:.2f}",
+            'scale_5': f"{unweighted * 1.25:.2f}",
+            'percent': f"{unweighted * 25:.1f}",
+        })
+    return variants
+
+
+def year_variants(value: str) -> Dict[str, str]:
+    match = re.search(r'\b(19|20)\d{2}\b', value)
+    if not match:
+        return {}
+    year = match.group()
+    return {'year': year, 'class_of': f"Class of {year}", 'short': f"'{year[2:]}"}
+
+
+def zip_variants(value: str) -> Dict[str, str]:
+    digits = re.sub(r'\D', '', value)
+    if len(digits) not in (5, 9):
+        return {}
+    variants = {'zip5': digits[:5]}
+    if len(digits) == 9:
+        variants['zip9'] = f"{digits[:5]}-{digits[5:]}"
+    return variants
+
+
+VARIANT_BUILDERS = {
+    'phone': phone_variants,
+    'date': date_variants,
+    'state': state_variants,
+    'country': country_variants,
+    'gpa': gpa_variants,
+    'year': year_variants,
+    'zip': zip_variants,
+}
+
+
+class CompiledProfile:
+    """A profile's values with every format variant worked out up front.
+
+    values maps each key to the value as given; variants maps keys whose kind
+    is known (see KIND_BY_KEY) to {format name: string}. Filling only looks
+    these up.
+    """
+
+    def __init__(self, values: Dict[str, Any]):
+        self.values = dict(values)
+        self.variants = {}
+        self.kinds = {}
+        # Variants by the raw value, for instructions that carry a value but no key
+        self.by_value = {}
+        for key, value in self.values.items():
+            kind = KIND_BY_KEY.get(key.rsplit('.', 1)[-1])
+            if not kind or not isinstance(value, (str, int, float)) or value in ('', None):
+                continue
+            if kind == 'gpa':
+                variants = gpa_variants(str(value), self._gpa_scale(key))
+            else:
+                variants = VARIANT_BUILDERS[kind](str(value))
+            if not variants:
+                continue
+            variants['raw'] = str(value)
+            self.kinds[key] = kind
+            self.variants[key] = variants
+            self.by_value.setdefault(str(value), (kind, variants))
+        # Every distinct full format of each value, the value as given first
+        self.candidates = {key: self._whole(self.kinds[key], variants)
+                           for key, variants in self.variants.items()}
+
+    def _gpa_scale(self, key: str) -> Any:
+        """Scale given next to a GPA key, if any"""
+        prefix = key[:len(key) - len(key.rsplit('.', 1)[-1])]
+        for name in GPA_SCALE_KEYS:
+            if self.values.get(prefix + name) not in (None, ''):
+                return self.values[prefix + name]
+        return None
+
+    @staticmethod
+    def _unique(strings) -> List[str]:
+        seen = set()
+        return [s for s in strings if s and not (s in seen or seen.add(s))]
+
+    @classmethod
+    def _whole(cls, kind: str, variants: Dict[str, str]) -> List[str]:
+        partial = PARTIAL_FORMATS.get(kind, set())
+        return cls._unique([variants['raw']] + [value for name, value in variants.items()
+                                                if name not in partial])
+
+    @staticmethod
+    def _pick(variants: Dict[str, str], transform: Optional[str],
+              field_type: Optional[str]) -> Optional[str]:
+        for name in (INPUT_TYPE_FORMATS.get(field_type), transform, DEFAULT_FORMATS.get(transform)):
+            if name and name in variants:
+                return variants[name]
+        return None
+
+    def value_for(self, key: str, field_type: str = None, transform: str = None) -> Any:
+        """The value of key in the format the field needs"""
+        value = self.values.get(key)
+        variants = self.variants.get(key)
+        if variants:
+            return self._pick(variants, transform, field_type) or value
+        return value
+
+    def transform(self, value: str, transform: str = None, field_type: str = None) -> str:
+        """Reformat a value taken from this profile for a transform hint or input type"""
+        entry = self.by_value.get(value)
+        if not entry:
+            return value
+        return self._pick(entry[1], transform, field_type) or value
+
+    def options_for(self, key: str) -> List[str]:
+        """Every format of key's value, the value as given first"""
+        if key in self.candidates:
+            return self.candidates[key]
+        value = self.values.get(key)
+        return [str(value)] if isinstance(value, (str, int, float)) and value != '' else []
+
+    def options_for_value(self, value: str) -> List[str]:
+        """Every format of a value taken from this profile, the value itself first"""
+        entry = self.by_value.get(value)
+        if not entry:
+            return [value]
+        return self._unique([value] + self._whole(*entry))
+
+
+_compiled = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def profile_hash(values: Dict[str, Any]) -> str:
+    payload = json.dumps(values, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def compile_profile(values: Dict[str, Any]) -> CompiledProfile:
+    """Compiled variants of a flat profile, built once per distinct profile"""
+    key = profile_hash(values)
+    with _compiled_lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _compiled.move_to_end(key)
+            return compiled
+
+    compiled = CompiledProfile(values)
+    with _compiled_lock:
+        _compiled[key] = compiled
+        while len(_compiled) > MAX_COMPILED_PROFILES:
+            _compiled.popitem(last=False)
+    return compiled
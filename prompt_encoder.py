@@ -0,0 +1,94 @@
+# prompt_encoder.py
+import json
+from typing import Any, Dict, List
+
+from form_cache import flatten_user_data
+
+# Input types that never carry user data
+NON_FILLABLE_TYPES = ('hidden', 'submit', 'button', 'reset', 'image')
+
+# User values longer than this are sent as an @key reference instead of in full
+MAX_INLINE_VALUE_CHARS = 60
+
+# Prefix marking a value the model should fill with a user-data key reference
+VALUE_REF_PREFIX = '@'
+
+_token_encoding = None
+
+
+def compact_json(data: Any) -> str:
+    """JSON without indentation or padding"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def compact_fields(form_fields: List[Dict]) -> List[Dict]:
+    """Drop non-fillable fields and empty or default attributes"""
+    compacted = []
+    for field in form_fields:
+        if field.get('type') in NON_FILLABLE_TYPES:
+            continue
+
+        entry = {'selector': field.get('selector', '')}
+        if field.get('tag') != 'input':
+            entry['tag'] = field.get('tag')
+        elif field.get('type') and field.get('type') != 'text':
+            entry['type'] = field['type']
+        for key in ('name', 'id', 'label', 'placeholder'):
+            if field.get(key):
+                entry[key] = field[key]
+        if field.get('required'):
+            entry['required'] = True
+        # Classes only help when nothing else describes the field
+        if field.get('class') and not any(entry.get(k) for k in ('name', 'id', 'label', 'placeholder')):
+            entry['class'] = field['class']
+
+        if 'options' in field:
+            entry['options'] = [
+                opt['text'] if opt.get('value', '') in ('', opt.get('text')) else [opt['value'], opt['text']]
+                for opt in field['options']
+            ]
+        compacted.append(entry)
+    return compacted
+
+
+def compact_user_data(user_data: Dict, max_value_chars: int = MAX_INLINE_VALUE_CHARS) -> Dict[str, str]:
+    """Flatten user data, replacing long values with @key references"""
+    compacted = {}
+    for path, value in flatten_user_data(user_data).items():
+        if not value:
+            continue
+        if len(value) > max_value_chars:
+            compacted[path] = f"{VALUE_REF_PREFIX}{path} ({len(value)} chars)"
+        else:
+            compacted[path] = value
+    return compacted
+
+
+def resolve_value_refs(instructions: List[Dict], user_data: Dict) -> List[Dict]:
+    """Replace @key values returned by the model with the user's full values"""
+    flat = None
+    resolved = []
+    for instruction in instructions:
+        value = instruction.get('value')
+        if isinstance(value, str) and value.startswith(VALUE_REF_PREFIX):
+            if flat is None:
+                flat = flatten_user_data(user_data)
+            path = value[len(VALUE_REF_PREFIX):].split(' ', 1)[0]
+            if path in flat:
+                instruction = {**instruction, 'value': flat[path]}
+        resolved.append(instruction)
+    return resolved
+
+
+def count_tokens(text: str) -> int:
+    """Token count using tiktoken when installed, otherwise a 4 chars/token estimate"""
+    global _token_encoding
+    if _token_encoding is None:
+        try:
+            import tiktoken
+            _token_encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception:
+            _token_encoding = False
+    if _token_encoding:
+        return len(_token_encoding.encode(text))
+    return (len(text) + 3) // 4
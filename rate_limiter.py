@@ -0,0 +1,108 @@
+# rate_limiter.py
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlite_store import write_transaction
+
+
+class RateLimiter:
+    """Per-provider token buckets shared by every worker process through SQLite.
+
+    Each provider gets one bucket per window (e.g. hourly and daily). A call
+    needs a token from every window; buckets refill continuously, so callers
+    can wait briefly for capacity instead of failing over immediately.
+    """
+
+    def __init__(self, path: str, limits: Dict[str, Tuple[int, float]]):
+        self.path = path
+        # window name -> (capacity, period in seconds)
+        self.limits = limits
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with write_transaction(self.path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                "provider TEXT NOT NULL, window TEXT NOT NULL, "
+                "tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (provider, window))"
+            )
+
+    def _refilled(self, conn, provider: str, now: float) -> Dict[str, float]:
+        """Current token count per window after refilling for elapsed time"""
+        rows = dict(
+            (window, (tokens, updated_at))
+            for window, tokens, updated_at in conn.execute(
+                "SELECT window, tokens, updated_at FROM rate_buckets WHERE provider = ?",
+                (provider,)
+            )
+        )
+        levels = {}
+        for window, (capacity, period) in self.limits.items():
+            if window in rows:
+                tokens, updated_at = rows[window]
+                tokens = min(capacity, tokens + max(0.0, now - updated_at) * capacity / period)
+            else:
+                tokens = float(capacity)
+            levels[window] = tokens
+        return levels
+
+    def try_acquire(self, provider: str) -> Tuple[bool, float]:
+        """Take one token from every window; returns (acquired, seconds until capacity)"""
+        now = time.time()
+        try:
+            with write_transaction(self.path) as conn:
+                levels = self._refilled(conn, provider, now)
+                wait = 0.0
+                for window, tokens in levels.items():
+                    if tokens < 1:
+                        capacity, period = self.limits[window]
+                        wait = max(wait, (1 - tokens) * period / capacity)
+                if wait > 0:
+                    return False, wait
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rate_buckets (provider, window, tokens, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(provider, window, tokens - 1, now) for window, tokens in levels.items()]
+                )
+                return True, 0.0
+        except sqlite3.Error as e:
+            # Don't take the service down because the limiter store is unavailable
+            print(f"Rate limiter store error, allowing call: {e}")
+            return True, 0.0
+
+    def acquire(self, provider: str, timeout: float = 0) -> bool:
+        """Take a token, waiting up to timeout seconds for the buckets to refill"""
+        deadline = time.monotonic() + timeout
+        while True:
+            acquired, wait = self.try_acquire(provider)
+            if acquired:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or wait > remaining:
+                return False
+            time.sleep(wait)
+
+    def utilization(self, provider: Optional[str] = None) -> Dict[str, Dict]:
+        """Available tokens and utilization per provider and window"""
+        now = time.time()
+        with write_transaction(self.path) as conn:
+            providers = [provider] if provider else [
+                row[0] for row in conn.execute("SELECT DISTINCT provider FROM rate_buckets")
+            ]
+            report = {}
+            for name in providers:
+                levels = self._refilled(conn, name, now)
+                report[name] = {
+                    window: {
+                        'limit': self.limits[window][0],
+                        'available': round(tokens, 2),
+                        'utilization': round(1 - tokens / self.limits[window][0], 3)
+                    }
+                    for window, tokens in levels.items()
+                }
+            return report
@@ -0,0 +1,101 @@
+# select_options.py
+from typing import Any, Dict, List, Optional
+
+# Lowest score an option may have and still be chosen
+MIN_OPTION_SCORE = 0.6
+
+# Ranks every option of a <select> against the candidate values (the value as
+# given first, then its other formats) and returns the best match. Tiers, best
+# first: exact value or text, case-insensitive, normalized (letters and digits
+# only), prefix, then fuzzy (character bigram overlap, only between texts with
+# the same digits so "Class of 2024" never passes for 2025). Later candidates
+# score slightly lower so the value as given wins ties.
+MATCH_OPTION_JS = """
+const normalizeOption = (text) => text.toLowerCase().replace(/[^a-z0-9]/g, '');
+const digitsOf = (text) => text.replace(/[^0-9]/g, '');
+const bigrams = (text) => {
+    const grams = new Map();
+    for (let i = 0; i < text.length - 1; i++) {
+        const gram = text.slice(i, i + 2);
+        grams.set(gram, (grams.get(gram) || 0) + 1);
+    }
+    return grams;
+};
+const similarity = (a, b) => {
+    if (a.length < 2 || b.length < 2) return 0;
+    const gramsA = bigrams(a);
+    let shared = 0;
+    bigrams(b).forEach((count, gram) => { shared += Math.min(count, gramsA.get(gram) || 0); });
+    return 2 * shared / (a.length + b.length - 2);
+};
+const matchOption = (select, candidates, minScore) => {
+    const options = Array.from(select.options).filter((o) => !o.disabled).map((o) => {
+        const text = o.text.trim();
+        return {option: o, value: o.value, text: text, lower: text.toLowerCase(),
+                valueLower: o.value.toLowerCase(), norm: normalizeOption(text),
+                valueNorm: normalizeOption(o.value), digits: digitsOf(text)};
+    });
+    let best = null;
+    candidates.forEach((candidate, rank) => {
+        const wanted = String(candidate).trim();
+        if (!wanted) return;
+        const lower = wanted.toLowerCase();
+        const norm = normalizeOption(wanted);
+        const digits = digitsOf(norm);
+        const penalty = rank * 0.001;
+        for (const o of options) {
+            let score = 0;
+            let method = null;
+            if (o.value === wanted || o.text === wanted) {
+                score = 1; method = 'exact';
+            } else if (o.lower === lower || o.valueLower === lower) {
+                score = 0.95; method = 'case-insensitive';
+            } else if (norm && (o.norm === norm || o.valueNorm === norm)) {
+                score = 0.9; method = 'normalized';
+            } else if (norm.length >= 2 && o.norm && (o.norm.startsWith(norm) || norm.startsWith(o.norm))) {
+                score = 0.75 + 0.1 * Math.min(norm.length, o.norm.length) / Math.max(norm.length, o.norm.length);
+                method = 'prefix';
+            } else if (o.value !== '' && norm && o.digits === digits) {
+                score = 0.7 * similarity(norm, o.norm);
+                method = 'fuzzy';
+            }
+            score -= penalty;
+            if (method && (!best || score > best.score)) {
+                best = {option: o.option, value: o.value, text: o.text, score: score,
+                        method: method, candidate: wanted};
+            }
+        }
+    });
+    if (!best || best.score < minScore) return null;
+    best.score = Math.round(best.score * 1000) / 1000;
+    return best;
+};
+const chooseOption = (select, candidates, minScore) => {
+    const match = matchOption(select, candidates, minScore);
+    if (!match) return {ok: false, error: 'no matching option'};
+    select.value = match.value;
+    if (select.selectedIndex !== match.option.index) select.selectedIndex = match.option.index;
+    select.dispatchEvent(new Event('input', {bubbles: true}));
+    select.dispatchEvent(new Event('change', {bubbles: true}));
+    return {ok: true, value: match.text, optionValue: match.value, score: match.score,
+            method: match.method, candidate: match.candidate};
+};
+"""
+
+# Picks and selects the best option of one <select> in a single round trip
+SELECT_OPTION_SCRIPT = MATCH_OPTION_JS + """
+return chooseOption(arguments[0], arguments[1], arguments[2]);
+"""
+
+
+def select_best_option(driver, element, candidates: List[str],
+                       min_score: float = MIN_OPTION_SCORE) -> Optional[Dict[str, Any]]:
+    """Select the option best matching any candidate value.
+
+    Returns the chosen option's text and value, its score (1 for an exact
+    match) and the tier that matched, or None when nothing scored min_score.
+    """
+    result = driver.execute_script(SELECT_OPTION_SCRIPT, element, list(candidates), min_score)
+    if not result or not result.get('ok'):
+        return None
+    return result
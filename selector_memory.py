@@ -0,0 +1,163 @@
+# selector_memory.py
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# A remembered selector is dropped after failing this many times in a row
+MAX_CONSECUTIVE_FAILURES = 3
+
+# Looks up remembered selectors in the current frame in one call; an entry is
+# null when its selector no longer matches a usable form control
+VALIDATE_SELECTORS_SCRIPT = """
+return arguments[0].map((selector) => {
+    let el;
+    try {
+        el = document.querySelector(selector);
+    } catch (e) {
+        return null;
+    }
+    if (!el || el.disabled || !/^(INPUT|TEXTAREA|SELECT)$/.test(el.tagName)) return null;
+    const tag = el.tagName.toLowerCase();
+    return {
+        element: el,
+        type: tag === 'input' ? (el.getAttribute('type') || 'text').toLowerCase() : tag
+    };
+});
+"""
+
+
+def page_key(url: str) -> Optional[Tuple[str, str]]:
+    """(domain, path) a page's selectors are remembered under, or None for non-web URLs"""
+    parsed = urlparse(url or '')
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return None
+    return parsed.hostname.lower(), parsed.path.rstrip('/') or '/'
+
+
+class SelectorMemory:
+    """Selectors that filled a field on a page, with success and failure counts.
+
+    Mappings are keyed by domain and URL path and kept in SQLite so every
+    filler process shares them. A mapping is deleted once it fails
+    max_failures times in a row, and the field is detected afresh next visit.
+    """
+
+    def __init__(self, path: str, max_failures: int = MAX_CONSECUTIVE_FAILURES):
+        self.path = path
+        self.max_failures = max_failures
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS selector_memory ("
+                "domain TEXT NOT NULL, path TEXT NOT NULL, field TEXT NOT NULL, "
+                "selector TEXT NOT NULL, frame TEXT NOT NULL, "
+                "successes INTEGER NOT NULL DEFAULT 0, failures INTEGER NOT NULL DEFAULT 0, "
+                "consecutive_failures INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (domain, path, field))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, url: str) -> Dict[str, Dict[str, Any]]:
+        """Remembered mappings for a page: field -> {selector, frame, successes, failures}"""
+        key = page_key(url)
+        if not key:
+            return {}
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT field, selector, frame, successes, failures FROM selector_memory "
+                    "WHERE domain = ? AND path = ?",
+                    key
+                ).fetchall()
+        except Exception as e:
+            print(f"Error reading selector memory: {e}")
+            return {}
+
+        return {
+            field: {
+                'selector': selector,
+                'frame': json.loads(frame),
+                'successes': successes,
+                'failures': failures
+            }
+            for field, selector, frame, successes, failures in rows
+        }
+
+    def record(self, url: str, outcomes: Dict[str, Dict[str, Any]]):
+        """Count fill outcomes: field -> {selector, frame, success}.
+
+        A success stores the selector (replacing any other one remembered for
+        the field). A failure only counts against the selector it was made
+        with, and deletes it after too many in a row.
+        """
+        key = page_key(url)
+        if not key or not outcomes:
+            return
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                for field, outcome in outcomes.items():
+                    selector = outcome['selector']
+                    if outcome['success']:
+                        conn.execute(
+                            "INSERT INTO selector_memory (domain, path, field, selector, frame, "
+                            "successes, updated_at) VALUES (?, ?, ?, ?, ?, 1, ?) "
+                            "ON CONFLICT (domain, path, field) DO UPDATE SET "
+                            "successes = CASE WHEN selector = excluded.selector THEN successes + 1 ELSE 1 END, "
+                            "failures = CASE WHEN selector = excluded.selector THEN failures ELSE 0 END, "
+                            "selector = excluded.selector, frame = excluded.frame, "
+                            "consecutive_failures = 0, updated_at = excluded.updated_at",
+                            key + (field, selector, json.dumps(outcome.get('frame', [])), now)
+                        )
+                    else:
+                        conn.execute(
+                            "UPDATE selector_memory SET failures = failures + 1, "
+                            "consecutive_failures = consecutive_failures + 1, updated_at = ? "
+                            "WHERE domain = ? AND path = ? AND field = ? AND selector = ?",
+                            (now,) + key + (field, selector)
+                        )
+                conn.execute(
+                    "DELETE FROM selector_memory WHERE domain = ? AND path = ? "
+                    "AND consecutive_failures >= ?",
+                    key + (self.max_failures,)
+                )
+        except Exception as e:
+            print(f"Error writing selector memory: {e}")
+
+    def forget(self, url: str):
+        """Drop everything remembered for a page"""
+        key = page_key(url)
+        if not key:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM selector_memory WHERE domain = ? AND path = ?", key)
+        except Exception as e:
+            print(f"Error clearing selector memory: {e}")
+
+
+def default_selector_memory() -> Optional[SelectorMemory]:
+    """Store at SELECTOR_MEMORY_PATH (default cache/selector_memory.db); None when set empty"""
+    path = os.getenv('SELECTOR_MEMORY_PATH', 'cache/selector_memory.db')
+    if not path:
+        return None
+    try:
+        return SelectorMemory(path, int(os.getenv('SELECTOR_MEMORY_MAX_FAILURES', MAX_CONSECUTIVE_FAILURES)))
+    except Exception as e:
+        print(f"Error opening selector memory: {e}")
+        return None
@@ -0,0 +1,20 @@
+# sqlite_store.py
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def write_transaction(path: str):
+    """Connection inside a transaction holding the database's write lock"""
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+    try:
+        # Take the write lock up front so read-modify-write is atomic across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()